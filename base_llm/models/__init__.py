@@ -1 +1,2 @@
-from . import llm_provider
\ No newline at end of file
+from . import llm_provider
+from . import llm_provider_log
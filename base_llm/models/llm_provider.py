@@ -1,11 +1,29 @@
 import json
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from odoo import api, fields, models, _
+from odoo import api, fields, models, tools, _
 from odoo.exceptions import UserError
 
 _logger = logging.getLogger(__name__)
 
+# Request timeouts (seconds)
+CONNECT_TIMEOUT = 5.0
+MIN_READ_TIMEOUT = 10.0
+MAX_READ_TIMEOUT = 180.0
+# Rough characters per token, and seconds per thousand tokens
+CHARS_PER_TOKEN = 4
+READ_TIMEOUT_PER_PROMPT_KTOKEN = 2.0
+READ_TIMEOUT_PER_COMPLETION_KTOKEN = 10.0
+# Completion length assumed while the provider has no recorded calls
+DEFAULT_COMPLETION_TOKENS = 500
+# Margin applied to the 95th percentile of the recorded durations
+LATENCY_MARGIN = 2.0
+LATENCY_SAMPLE_SIZE = 100
+# Concurrent requests sent by process_prompts
+DEFAULT_WORKERS = 4
+
 
 class LLMProvider(models.Model):
     _name = "llm.provider"
@@ -48,17 +66,22 @@ class LLMProvider(models.Model):
     @api.model
     def get_default_provider(self):
         """Get the default LLM provider for the current company"""
-        provider = self.search([
+        return self.browse(self._get_default_provider_id(self.env.company.id))
+
+    @api.model
+    @tools.ormcache("company_id")
+    def _get_default_provider_id(self, company_id):
+        provider = self.sudo().search([
             ("is_default", "=", True),
             ("active", "=", True),
-            ("company_id", "=", self.env.company.id),
+            ("company_id", "=", company_id),
         ], limit=1)
         if not provider:
-            provider = self.search([
+            provider = self.sudo().search([
                 ("active", "=", True),
-                ("company_id", "=", self.env.company.id),
+                ("company_id", "=", company_id),
             ], limit=1)
-        return provider
+        return provider.id
 
     @api.model_create_multi
     def create(self, vals_list):
@@ -70,7 +93,9 @@ class LLMProvider(models.Model):
                     ("company_id", "=", vals.get("company_id", self.env.company.id)),
                 ])
                 existing_default.write({"is_default": False})
-        return super().create(vals_list)
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
 
     def write(self, vals):
         if vals.get("is_default"):
@@ -82,7 +107,15 @@ class LLMProvider(models.Model):
                     ("id", "!=", record.id),
                 ])
                 existing_default.write({"is_default": False})
-        return super().write(vals)
+        res = super().write(vals)
+        if {"is_default", "company_id", "active", "sequence"} & set(vals):
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
 
     def _prepare_headers(self):
         """Prepare headers for API request"""
@@ -131,6 +164,145 @@ class LLMProvider(models.Model):
         
         return payload
 
+    def _get_usage_percentiles(self, percentile=0.95):
+        """Percentiles of the recent successful call durations and
+        completion lengths, as a (duration, completion_tokens) tuple"""
+        self.ensure_one()
+        self.env.cr.execute(
+            """
+            SELECT percentile_cont(%s) WITHIN GROUP (ORDER BY duration),
+                   percentile_cont(%s) WITHIN GROUP (ORDER BY completion_tokens)
+              FROM (
+                    SELECT duration, completion_tokens FROM llm_provider_log
+                     WHERE provider_id = %s AND success
+                  ORDER BY id DESC
+                     LIMIT %s
+                   ) AS recent
+            """,
+            [percentile, percentile, self.id, LATENCY_SAMPLE_SIZE],
+        )
+        duration, completion_tokens = self.env.cr.fetchone()
+        return duration or 0.0, completion_tokens or 0
+
+    def _get_request_timeout(self, prompt, max_tokens):
+        """Return the (connect, read) timeouts of a request.
+
+        The read timeout grows with the prompt size and the expected
+        completion length, taken from the provider's recent calls and capped
+        by max_tokens, which is only an upper bound and usually far above
+        what is generated. It is at least a margin above the provider's
+        recent 95th percentile latency, and never goes past the deadline set
+        in the ``request_deadline`` context key (a time.monotonic() value),
+        if any.
+        """
+        self.ensure_one()
+        latency, completion_tokens = self._get_usage_percentiles()
+        completion_tokens = completion_tokens or DEFAULT_COMPLETION_TOKENS
+        if max_tokens:
+            completion_tokens = min(completion_tokens, max_tokens)
+        prompt_tokens = len(prompt) / CHARS_PER_TOKEN
+        read_timeout = (
+            MIN_READ_TIMEOUT
+            + READ_TIMEOUT_PER_PROMPT_KTOKEN * prompt_tokens / 1000
+            + READ_TIMEOUT_PER_COMPLETION_KTOKEN * completion_tokens / 1000
+        )
+        read_timeout = max(read_timeout, latency * LATENCY_MARGIN)
+        read_timeout = min(read_timeout, MAX_READ_TIMEOUT)
+
+        deadline = self.env.context.get("request_deadline")
+        if deadline:
+            remaining = deadline - time.monotonic()
+            if remaining < 1:
+                raise UserError(_("The processing deadline was exceeded."))
+            read_timeout = min(read_timeout, remaining)
+        return (min(CONNECT_TIMEOUT, read_timeout), read_timeout)
+
+    def _log_call(self, **values):
+        """Record the outcome and latency of a call to the provider"""
+        self.ensure_one()
+        return self.env["llm.provider.log"].sudo().create(
+            dict(values, provider_id=self.id)
+        )
+
+    def _prepare_request(self, prompt, **kwargs):
+        """Build the arguments of the HTTP request sending a prompt"""
+        self.ensure_one()
+        payload = self._prepare_payload(prompt, **kwargs)
+        return {
+            "url": self.endpoint,
+            "headers": self._prepare_headers(),
+            "json": payload,
+            "timeout": self._get_request_timeout(prompt, payload.get("max_tokens")),
+        }
+
+    @api.model
+    def _send_request(self, request):
+        """Send a prepared request.
+
+        Does not use the ORM, so that requests can be sent from worker
+        threads. Returns the response JSON or the error, with the duration.
+        """
+        start = time.monotonic()
+        try:
+            response = requests.post(**request)
+            if response.status_code != 200:
+                return {
+                    "success": False,
+                    "error": f"LLM API error: {response.status_code} - {response.text}",
+                    "duration": time.monotonic() - start,
+                }
+            return {
+                "success": True,
+                "raw_response": response.json(),
+                "duration": time.monotonic() - start,
+            }
+        except (requests.exceptions.RequestException, ValueError) as e:
+            return {
+                "success": False,
+                "error": f"Request error: {str(e)}",
+                "duration": time.monotonic() - start,
+            }
+
+    def _process_response(self, response, **kwargs):
+        """Log a sent request and extract the content of its response"""
+        self.ensure_one()
+        if not response["success"]:
+            _logger.error(response["error"])
+            self._log_call(success=False, duration=response["duration"])
+            return {"success": False, "error": response["error"]}
+
+        result = response["raw_response"]
+        usage = result.get("usage") or {}
+        self._log_call(
+            success=True,
+            duration=response["duration"],
+            prompt_tokens=usage.get("prompt_tokens", usage.get("input_tokens", 0)),
+            completion_tokens=usage.get(
+                "completion_tokens", usage.get("output_tokens", 0)
+            ),
+        )
+
+        # Extract content based on provider type
+        if self.provider_type in ["groq", "openai"]:
+            content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
+        elif self.provider_type == "anthropic":
+            content = result.get("content", [{}])[0].get("text", "")
+        else:
+            content = result.get("content", result.get("text", ""))
+
+        # Try to parse as JSON if response_format is json_object
+        if kwargs.get("response_format", {}).get("type") == "json_object":
+            try:
+                content = json.loads(content)
+            except json.JSONDecodeError:
+                _logger.warning("Failed to parse LLM response as JSON")
+
+        return {
+            "success": True,
+            "content": content,
+            "raw_response": result,
+        }
+
     def process_prompt(self, prompt, **kwargs):
         """Process a prompt using the LLM provider"""
         self.ensure_one()
@@ -139,55 +311,45 @@ class LLMProvider(models.Model):
             return {"success": False, "error": "Provider is not active"}
         
         try:
-            headers = self._prepare_headers()
-            payload = self._prepare_payload(prompt, **kwargs)
-            
+            request = self._prepare_request(prompt, **kwargs)
             _logger.info(f"Sending request to {self.provider_type} LLM: {self.endpoint}")
-            
-            response = requests.post(
-                self.endpoint,
-                headers=headers,
-                json=payload,
-                timeout=30,
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                
-                # Extract content based on provider type
-                if self.provider_type in ["groq", "openai"]:
-                    content = result.get("choices", [{}])[0].get("message", {}).get("content", "")
-                elif self.provider_type == "anthropic":
-                    content = result.get("content", [{}])[0].get("text", "")
-                else:
-                    content = result.get("content", result.get("text", ""))
-                
-                # Try to parse as JSON if response_format is json_object
-                if kwargs.get("response_format", {}).get("type") == "json_object":
-                    try:
-                        content = json.loads(content)
-                    except json.JSONDecodeError:
-                        _logger.warning("Failed to parse LLM response as JSON")
-                
-                return {
-                    "success": True,
-                    "content": content,
-                    "raw_response": result,
-                }
-            else:
-                error_msg = f"LLM API error: {response.status_code} - {response.text}"
-                _logger.error(error_msg)
-                return {"success": False, "error": error_msg}
-                
-        except requests.exceptions.RequestException as e:
-            error_msg = f"Request error: {str(e)}"
-            _logger.error(error_msg)
-            return {"success": False, "error": error_msg}
+            return self._process_response(self._send_request(request), **kwargs)
         except Exception as e:
             error_msg = f"Unexpected error: {str(e)}"
             _logger.error(error_msg)
             return {"success": False, "error": error_msg}
 
+    def process_prompts(self, prompts, max_workers=DEFAULT_WORKERS, **kwargs):
+        """Process several prompts, sending at most max_workers at a time.
+
+        Requests are prepared and their responses processed in the calling
+        thread, only the HTTP calls run in worker threads. Returns the
+        results in the order of the prompts.
+        """
+        self.ensure_one()
+        if not self.active:
+            return [{"success": False, "error": "Provider is not active"}] * len(prompts)
+
+        results = [None] * len(prompts)
+        requests_to_send = []
+        for index, prompt in enumerate(prompts):
+            try:
+                requests_to_send.append((index, self._prepare_request(prompt, **kwargs)))
+            except Exception as e:
+                results[index] = {"success": False, "error": f"Unexpected error: {str(e)}"}
+
+        _logger.info(
+            "Sending %s requests to %s LLM: %s",
+            len(requests_to_send), self.provider_type, self.endpoint,
+        )
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            responses = executor.map(
+                self._send_request, [request for _index, request in requests_to_send]
+            )
+            for (index, _request), response in zip(requests_to_send, responses):
+                results[index] = self._process_response(response, **kwargs)
+        return results
+
     def test_connection(self):
         """Test the connection to the LLM provider"""
         self.ensure_one()
@@ -0,0 +1,19 @@
+from odoo import fields, models
+
+
+class LLMProviderLog(models.Model):
+    _name = "llm.provider.log"
+    _description = "LLM Provider Call Log"
+    _order = "id desc"
+
+    provider_id = fields.Many2one(
+        "llm.provider",
+        string="Provider",
+        required=True,
+        index=True,
+        ondelete="cascade",
+    )
+    success = fields.Boolean(string="Success")
+    duration = fields.Float(string="Duration (s)", digits=(16, 3))
+    prompt_tokens = fields.Integer(string="Prompt Tokens")
+    completion_tokens = fields.Integer(string="Completion Tokens")
@@ -1,3 +1,4 @@
 from . import ocr_provider
+from . import ocr_provider_log
 from . import ocr_space
 from . import open_ocr
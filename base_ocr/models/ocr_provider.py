@@ -1,9 +1,51 @@
 import logging
-from odoo import models, fields, api, _
+import re
+import time
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import UserError
 
 _logger = logging.getLogger(__name__)
 
+DATE_RE = re.compile(
+    r"\b(\d{1,4}[./-]\d{1,2}[./-]\d{1,4}|\d{1,2}\s+[A-Za-z\u00C0-\u017F]{3,}\.?\s+\d{2,4})\b"
+)
+AMOUNT_RE = re.compile(r"\d[\d .,']*[.,]\d{2}\b")
+TOTAL_RE = re.compile(
+    r"\b(total|amount due|balance due|montant|summe|gesamt|importe|totale)\b",
+    re.IGNORECASE,
+)
+PDF_PAGE_RE = re.compile(rb"/Type\s*/Page\b")
+
+# Request timeouts (seconds)
+CONNECT_TIMEOUT = 5.0
+MIN_READ_TIMEOUT = 10.0
+MAX_READ_TIMEOUT = 300.0
+READ_TIMEOUT_PER_MB = 10.0
+READ_TIMEOUT_PER_PAGE = 5.0
+# Margin applied to the 95th percentile of the recorded durations
+LATENCY_MARGIN = 2.0
+LATENCY_SAMPLE_SIZE = 100
+# Language letting the provider detect the language, for the providers
+# supporting it
+AUTO_LANGUAGE = "auto"
+AUTO_LANGUAGE_PROVIDERS = ("ocrspace",)
+
+
+def _build_language_index(mappings):
+    """Index every known language code to the code of each provider.
+
+    Codes of both sides of a provider mapping resolve to the provider's own
+    code, so a lookup is a single dict access whichever convention the
+    caller uses.
+    """
+    index = {}
+    for provider, mapping in mappings.items():
+        provider_index = index.setdefault(provider, {})
+        for source, target in mapping.items():
+            provider_index[source] = target
+            provider_index[target] = target
+    return index
+
 
 class OCRProvider(models.Model):
     _name = "ocr.provider"
@@ -64,6 +106,7 @@ class OCRProvider(models.Model):
             'tur': 'tur',     # Turkish
         }
     }
+    LANGUAGE_INDEX = _build_language_index(LANGUAGE_MAPPINGS)
 
     name = fields.Char(string="Name", required=True)
     provider_type = fields.Selection(
@@ -84,6 +127,143 @@ class OCRProvider(models.Model):
         default=lambda self: self.env.company,
     )
     is_default = fields.Boolean(string="Default Provider")
+    ocr_mode = fields.Selection(
+        [
+            ("fixed", "Fixed"),
+            ("adaptive", "Adaptive"),
+        ],
+        string="OCR Mode",
+        required=True,
+        default="fixed",
+        help="Adaptive runs the fastest settings first and only re-runs the "
+        "document with stronger settings when the result scores low.",
+    )
+    escalation_threshold = fields.Float(
+        string="Escalation Threshold",
+        default=0.6,
+        help="Results scoring below this value (0-1) are re-run with the "
+        "next, stronger settings.",
+    )
+    log_ids = fields.One2many("ocr.provider.log", "provider_id", string="Call Logs")
+    call_count = fields.Integer(string="Calls", compute="_compute_call_stats")
+    escalation_rate = fields.Float(
+        string="Escalation Rate", compute="_compute_call_stats"
+    )
+    avg_duration = fields.Float(
+        string="Average Duration (s)", compute="_compute_call_stats"
+    )
+    avg_escalation_duration = fields.Float(
+        string="Average Escalation Latency (s)",
+        compute="_compute_call_stats",
+        help="Average time added by re-runs, over the escalated calls.",
+    )
+
+    def _compute_call_stats(self):
+        stats = {
+            provider.id: (count, duration)
+            for provider, count, duration in self.env["ocr.provider.log"]._read_group(
+                [("provider_id", "in", self.ids)],
+                ["provider_id"],
+                ["__count", "duration:avg"],
+            )
+        }
+        escalations = {
+            provider.id: (count, duration)
+            for provider, count, duration in self.env["ocr.provider.log"]._read_group(
+                [("provider_id", "in", self.ids), ("escalated", "=", True)],
+                ["provider_id"],
+                ["__count", "escalation_duration:avg"],
+            )
+        }
+        for provider in self:
+            count, duration = stats.get(provider.id, (0, 0.0))
+            escalated, escalation_duration = escalations.get(provider.id, (0, 0.0))
+            provider.call_count = count
+            provider.avg_duration = duration or 0.0
+            provider.escalation_rate = escalated / count if count else 0.0
+            provider.avg_escalation_duration = escalation_duration or 0.0
+
+    @api.model
+    def _estimate_page_count(self, image_data, filename=None):
+        """Rough page count of a file, without parsing it"""
+        if filename and filename.lower().endswith(".pdf"):
+            return max(len(PDF_PAGE_RE.findall(image_data)), 1)
+        return 1
+
+    def _get_latency_percentile(self, percentile=0.95):
+        """Percentile of the recent successful call durations"""
+        self.ensure_one()
+        self.env.cr.execute(
+            """
+            SELECT percentile_cont(%s) WITHIN GROUP (ORDER BY duration)
+              FROM (
+                    SELECT duration FROM ocr_provider_log
+                     WHERE provider_id = %s AND success
+                  ORDER BY id DESC
+                     LIMIT %s
+                   ) AS recent
+            """,
+            [percentile, self.id, LATENCY_SAMPLE_SIZE],
+        )
+        return self.env.cr.fetchone()[0] or 0.0
+
+    def _get_request_timeout(self, image_data, filename=None):
+        """Return the (connect, read) timeouts of a request.
+
+        The read timeout grows with the payload size and page count, is at
+        least a margin above the provider's recent 95th percentile latency,
+        and never goes past the deadline set in the ``request_deadline``
+        context key (a time.monotonic() value), if any.
+        """
+        self.ensure_one()
+        pages = self._estimate_page_count(image_data, filename)
+        read_timeout = (
+            MIN_READ_TIMEOUT
+            + READ_TIMEOUT_PER_MB * len(image_data) / 1024 / 1024
+            + READ_TIMEOUT_PER_PAGE * (pages - 1)
+        )
+        read_timeout = max(read_timeout, self._get_latency_percentile() * LATENCY_MARGIN)
+        read_timeout = min(read_timeout, MAX_READ_TIMEOUT)
+
+        deadline = self.env.context.get("request_deadline")
+        if deadline:
+            remaining = deadline - time.monotonic()
+            if remaining < 1:
+                raise UserError(_("The processing deadline of the document was exceeded."))
+            read_timeout = min(read_timeout, remaining)
+        return (min(CONNECT_TIMEOUT, read_timeout), read_timeout)
+
+    def _log_call(self, **values):
+        """Record the outcome and latency of a call to the provider"""
+        self.ensure_one()
+        return self.env["ocr.provider.log"].sudo().create(
+            dict(values, provider_id=self.id)
+        )
+
+    @api.model
+    def _score_ocr_text(self, text):
+        """Score OCR output between 0 and 1 using text sanity heuristics.
+
+        Looks at the amount of text, the share of alphanumeric characters and
+        whether a date and a total could be found, which is what document
+        extraction needs.
+        """
+        if not text or len(text.strip()) < 20:
+            return 0.0
+        chars = [c for c in text if not c.isspace()]
+        alnum_ratio = len([c for c in chars if c.isalnum()]) / len(chars)
+        words = text.split()
+        word_ratio = len(
+            [w for w in words if len(w) > 1 and any(c.isalnum() for c in w)]
+        ) / len(words)
+        has_date = bool(DATE_RE.search(text))
+        has_total = bool(TOTAL_RE.search(text) and AMOUNT_RE.search(text))
+        return (
+            0.3 * min(alnum_ratio / 0.8, 1.0)
+            + 0.2 * word_ratio
+            + 0.25 * has_date
+            + 0.25 * has_total
+        )
 
     def _map_language_code(self, language):
         """Map language code between providers.
@@ -96,24 +276,14 @@ class OCRProvider(models.Model):
         """
         if not language:
             return 'eng'  # Default to English
-            
-        # If language code exists in target provider mapping, return as is
-        if language in self.LANGUAGE_MAPPINGS.get(self.provider_type, {}):
-            return language
-            
-        # Try to find mapping from other provider
-        for provider, mappings in self.LANGUAGE_MAPPINGS.items():
-            if provider != self.provider_type:
-                # If we find the language in another provider's mapping
-                if language in mappings:
-                    # Get the standard code (value) and then map it to target provider
-                    standard_code = mappings[language]
-                    # Find the key in target provider mapping that has this standard code as value
-                    for target_code, std_code in self.LANGUAGE_MAPPINGS[target_provider].items():
-                        if std_code == standard_code:
-                            return target_code
-                            
-        return 'eng'  # Default to English if no mapping found
+        if language == AUTO_LANGUAGE and self._supports_auto_language():
+            return AUTO_LANGUAGE
+        return self.LANGUAGE_INDEX.get(self.provider_type, {}).get(language, 'eng')
+
+    def _supports_auto_language(self):
+        """Whether the provider can detect the language of the text itself,
+        when requested with the ``auto`` language"""
+        return self.provider_type in AUTO_LANGUAGE_PROVIDERS
 
     @api.model
     def create(self, vals):
@@ -124,7 +294,9 @@ class OCRProvider(models.Model):
                     ("company_id", "=", vals.get("company_id", self.env.company.id)),
                 ]
             ).write({"is_default": False})
-        return super().create(vals)
+        records = super().create(vals)
+        self.env.registry.clear_cache()
+        return records
 
     def write(self, vals):
         if vals.get("is_default"):
@@ -135,10 +307,22 @@ class OCRProvider(models.Model):
                     ("id", "!=", self.id),
                 ]
             ).write({"is_default": False})
-        return super().write(vals)
+        res = super().write(vals)
+        if {"is_default", "company_id", "active"} & set(vals):
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
 
     def process_image(self, image_data, **kwargs):
-        """Process the image using the selected OCR provider"""
+        """Process the image using the selected OCR provider.
+
+        Keyword arguments are passed to the provider type method, e.g.
+        filename, language and ocr_mode to override the provider's mode.
+        """
         self.ensure_one()
 
         method_name = f"_process_{self.provider_type}"
@@ -154,6 +338,11 @@ class OCRProvider(models.Model):
         """Get the default OCR provider for the company"""
         if not company_id:
             company_id = self.env.company.id
-        return self.search(
+        return self.browse(self._get_default_provider_id(company_id))
+
+    @api.model
+    @tools.ormcache("company_id")
+    def _get_default_provider_id(self, company_id):
+        return self.sudo().search(
             [("company_id", "=", company_id), ("is_default", "=", True)], limit=1
-        )
+        ).id
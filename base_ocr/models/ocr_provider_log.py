@@ -0,0 +1,27 @@
+from odoo import models, fields
+
+
+class OCRProviderLog(models.Model):
+    _name = "ocr.provider.log"
+    _description = "OCR Provider Call Log"
+    _order = "id desc"
+
+    provider_id = fields.Many2one(
+        "ocr.provider",
+        string="Provider",
+        required=True,
+        index=True,
+        ondelete="cascade",
+    )
+    company_id = fields.Many2one(related="provider_id.company_id", store=True)
+    success = fields.Boolean(string="Success")
+    duration = fields.Float(string="Duration (s)", digits=(16, 3))
+    escalated = fields.Boolean(string="Escalated")
+    escalation_duration = fields.Float(
+        string="Escalation Duration (s)",
+        digits=(16, 3),
+        help="Time spent in the attempts that followed the first one.",
+    )
+    attempts = fields.Integer(string="Attempts", default=1)
+    score = fields.Float(string="Score", digits=(16, 2))
+    settings = fields.Char(string="Settings")
@@ -1,11 +1,24 @@
 import requests
 import logging
 import os
+import time
 from odoo import models, _
 from odoo.exceptions import UserError
+from .ocr_provider import AUTO_LANGUAGE
 
 _logger = logging.getLogger(__name__)
 
+# Settings used in fixed mode
+OCRSPACE_DEFAULT_SETTINGS = {"OCREngine": 1, "isTable": True, "scale": True}
+
+# Settings tried in order in adaptive mode, from the fastest to the strongest
+OCRSPACE_ADAPTIVE_STEPS = [
+    {"OCREngine": 1, "isTable": False, "scale": False},
+    {"OCREngine": 2, "isTable": True, "scale": True},
+]
+# Engine 1 does not support the automatic language detection
+OCRSPACE_AUTO_LANGUAGE_ENGINE = 2
+
 
 class OCRSpaceProvider(models.Model):
     _inherit = "ocr.provider"
@@ -22,22 +35,76 @@ class OCRSpaceProvider(models.Model):
         if not self.api_endpoint:
             self.api_endpoint = "https://api.ocr.space/parse/image"
 
+        # Get mapped language code for OCR.space
+        language = self._map_language_code(kwargs.get('language', 'eng'))
+
+        # Callers can force the fixed mode, e.g. for cheap sample requests
+        if kwargs.get("ocr_mode", self.ocr_mode) != "adaptive":
+            start = time.monotonic()
+            result = self._ocrspace_request(
+                image_data, filename, language, OCRSPACE_DEFAULT_SETTINGS
+            )
+            self._log_call(
+                success=result["success"],
+                duration=time.monotonic() - start,
+                settings=str(OCRSPACE_DEFAULT_SETTINGS),
+            )
+            return result
+
+        start = time.monotonic()
+        first_duration = 0.0
+        best, best_score, best_settings = None, -1.0, None
+        for attempt, settings in enumerate(OCRSPACE_ADAPTIVE_STEPS, start=1):
+            result = self._ocrspace_request(image_data, filename, language, settings)
+            if attempt == 1:
+                first_duration = time.monotonic() - start
+            score = self._score_ocrspace_result(result) if result["success"] else 0.0
+            _logger.info(
+                "OCR.space attempt %s with %s scored %.2f", attempt, settings, score
+            )
+            if score > best_score:
+                best, best_score, best_settings = result, score, settings
+            if score >= self.escalation_threshold:
+                break
+
+        duration = time.monotonic() - start
+        self._log_call(
+            success=best["success"],
+            duration=duration,
+            escalated=attempt > 1,
+            escalation_duration=duration - first_duration,
+            attempts=attempt,
+            score=best_score,
+            settings=str(best_settings),
+        )
+        best["score"] = best_score
+        return best
+
+    def _score_ocrspace_result(self, result):
+        """Score an OCR.space result, penalizing pages that failed to parse"""
+        pages = result.get("raw_pages") or []
+        parsed_ratio = (
+            len([p for p in pages if p.get("FileParseExitCode") == 1]) / len(pages)
+            if pages
+            else 0.0
+        )
+        return self._score_ocr_text(result.get("text")) * parsed_ratio
+
+    def _ocrspace_request(self, image_data, filename, language, settings):
+        """Send a single request to the OCR.space API."""
         # Get file extension from the filename
         ext = os.path.splitext(filename)[1].lstrip(".").upper() if filename else "PNG"
 
         headers = {"apikey": self.api_key}
+        if language == AUTO_LANGUAGE:
+            settings = dict(settings, OCREngine=OCRSPACE_AUTO_LANGUAGE_ENGINE)
 
-        # Get mapped language code for OCR.space
-        language = self._map_language_code(kwargs.get('language', 'eng'))
-
-        payload = {
-            "language": language,
-            "isOverlayRequired": False,
-            "OCREngine": 1,
-            "isTable": True,
-            "scale": True,
-            "filetype": ext,
-        }
+        payload = dict(
+            settings,
+            language=language,
+            isOverlayRequired=False,
+            filetype=ext,
+        )
 
         files = {
             "file": (
@@ -53,7 +120,7 @@ class OCRSpaceProvider(models.Model):
                 headers=headers,
                 files=files,
                 data=payload,
-                timeout=30,
+                timeout=self._get_request_timeout(image_data, filename),
             )
             response.raise_for_status()
             result = response.json()
@@ -63,9 +130,14 @@ class OCRSpaceProvider(models.Model):
                 _logger.error("OCR Error: %s", error_msg)
                 raise UserError(_("OCR processing failed: %s") % error_msg)
 
+            pages = [
+                page.get("ParsedText", "") for page in result["ParsedResults"]
+            ]
             return {
                 "success": True,
-                "text": result["ParsedResults"][0].get("ParsedText", ""),
+                "text": "\n".join(pages),
+                "pages": pages,
+                "raw_pages": result["ParsedResults"],
                 "raw_response": result,
             }
 
@@ -2,6 +2,7 @@ import requests
 import logging
 import base64
 import os
+import time
 from odoo import models, _
 from odoo.exceptions import UserError
 
@@ -20,6 +21,7 @@ class OpenOCRProvider(models.Model):
 
         # Get mapped language code for Open OCR
         language = self._map_language_code(kwargs.get("language", "eng"))
+        start = time.monotonic()
 
         try:
             # Convert image data to base64
@@ -41,7 +43,12 @@ class OpenOCRProvider(models.Model):
             api_url = f"{self.api_endpoint}/ocr"
             _logger.info("Making request to Open OCR API: %s", api_url)
 
-            response = requests.post(api_url, headers=headers, json=payload, timeout=30)
+            response = requests.post(
+                api_url,
+                headers=headers,
+                json=payload,
+                timeout=self._get_request_timeout(image_data, filename),
+            )
 
             _logger.info("Open OCR API Response Status: %s", response.status_code)
 
@@ -49,11 +56,13 @@ class OpenOCRProvider(models.Model):
 
             result = response.text
 
+            self._log_call(success=True, duration=time.monotonic() - start)
             return {"success": True, "text": result}
 
         except requests.exceptions.RequestException as e:
             error_msg = f"API Connection Error: {str(e)}"
             _logger.error("Open OCR API Error: %s", str(e))
+            self._log_call(success=False, duration=time.monotonic() - start)
             return {"success": False, "error": error_msg}
         except Exception as e:
             error_msg = str(e)
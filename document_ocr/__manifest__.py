@@ -1,6 +1,6 @@
 {
     "name": "Document OCR",
-    "version": "18.0.1.0.0",
+    "version": "18.0.1.2.0",
     "category": "Document Management",
     "summary": "OCR Processing for Documents",
     "sequence": 10,
@@ -0,0 +1,34 @@
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Move the JSON text of parsed_data into the jsonb extracted_data column"""
+    cr.execute(
+        """
+        SELECT 1 FROM information_schema.columns
+         WHERE table_name = 'document_ocr' AND column_name = 'parsed_data'
+        """
+    )
+    if not cr.fetchone():
+        return
+    cr.execute(
+        """
+        UPDATE document_ocr
+           SET extracted_data = parsed_data::jsonb
+         WHERE parsed_data IS NOT NULL
+           AND extracted_data IS NULL
+     RETURNING id
+        """
+    )
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    documents = env["document.ocr"].browse([row[0] for row in cr.fetchall()])
+    for field_name in (
+        "vendor_name",
+        "invoice_number",
+        "invoice_date",
+        "amount_total",
+        "extraction_confidence",
+    ):
+        env.add_to_compute(documents._fields[field_name], documents)
+    env.flush_all()
+    cr.execute("ALTER TABLE document_ocr DROP COLUMN parsed_data")
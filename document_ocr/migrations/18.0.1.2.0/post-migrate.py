@@ -0,0 +1,9 @@
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Restrict the document alias, created open to everyone, to known partners"""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    alias = env.ref("document_ocr.mail_alias_document_ocr", raise_if_not_found=False)
+    if alias and alias.alias_contact == "everyone":
+        alias.alias_contact = "partners"
@@ -1,2 +1,12 @@
 from . import document_ocr
+from . import document_ocr_batch
+from . import document_ocr_ingest
+from . import document_ocr_language
+from . import document_ocr_page
+from . import document_ocr_preview
+from . import document_ocr_profile
+from . import document_ocr_reextract
+from . import document_ocr_split
+from . import mail_thread
+from . import res_partner
 from . import vendor_bill
\ No newline at end of file
@@ -1,13 +1,60 @@
 import base64
+import hashlib
+import io
 import json
 import logging
 import os
 import tempfile
-from odoo import models, fields, api, _
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from odoo import models, fields, api, tools, Command, _
 from odoo.exceptions import UserError
+from odoo.addons.document_ocr.tools.date_normalizer import normalize_date
 
 _logger = logging.getLogger(__name__)
 
+# Options of the requests extracting the data from the OCR text
+EXTRACTION_PROMPT_OPTIONS = {"response_format": {"type": "json_object"}, "temperature": 0.1}
+# Number of follow-up prompts sent to fix invalid extracted fields
+MAX_REASK_ATTEMPTS = 1
+
+# Defaults of the queue processing, overridable with system parameters
+QUEUE_BATCH_SIZE = 50
+QUEUE_WORKERS = 4
+# Documents left processing for longer (seconds) are claimed again, e.g.
+# after a crash of the server running them
+QUEUE_STALE_AFTER = 3600
+# Overall time budget of the OCR and LLM requests of a document (seconds)
+DOCUMENT_DEADLINE = 300
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = ImageOps = None
+
+
+def _difference_hash(image_data):
+    """Return a 64-bit difference hash (hex) of an image, or False.
+
+    Re-scans of the same sheet of paper differ in their bytes but keep the
+    same brightness gradients, so they end up with the same hash.
+    """
+    if Image is None:
+        return False
+    try:
+        image = Image.open(io.BytesIO(image_data))
+        image = ImageOps.exif_transpose(image).convert("L").resize((9, 8), Image.LANCZOS)
+    except Exception as e:
+        _logger.debug("Cannot compute perceptual hash: %s", e)
+        return False
+    pixels = list(image.getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return "%016x" % bits
+
 
 class DocumentOCR(models.Model):
     _name = "document.ocr"
@@ -35,6 +82,7 @@ class DocumentOCR(models.Model):
     state = fields.Selection(
         [
             ("draft", "Draft"),
+            ("queued", "Queued"),
             ("processing", "Processing"),
             ("done", "Done"),
             ("error", "Error"),
@@ -47,8 +95,41 @@ class DocumentOCR(models.Model):
     related_record = fields.Reference(
         selection="_get_reference_models", string="Related Record", readonly=True
     )
-    ocr_result = fields.Text(string="OCR Result", readonly=True)
-    parsed_data = fields.Text(string="Parsed Data", readonly=True)
+    ocr_result = fields.Text(string="OCR Result", readonly=True, prefetch=False)
+    extracted_data = fields.Json(
+        string="Extracted Data", readonly=True, copy=False, prefetch=False
+    )
+    parsed_data = fields.Text(
+        string="Parsed Data",
+        compute="_compute_parsed_data",
+        inverse="_inverse_parsed_data",
+        readonly=True,
+    )
+    vendor_name = fields.Char(
+        string="Vendor Name", compute="_compute_extracted_keys", store=True, index=True
+    )
+    invoice_number = fields.Char(
+        string="Invoice Number",
+        compute="_compute_extracted_keys",
+        store=True,
+        index=True,
+    )
+    invoice_date = fields.Date(
+        string="Invoice Date", compute="_compute_extracted_keys", store=True, index=True
+    )
+    amount_total = fields.Float(
+        string="Total", compute="_compute_extracted_keys", store=True, index=True
+    )
+    extraction_confidence = fields.Float(
+        string="Extraction Confidence",
+        compute="_compute_extracted_keys",
+        store=True,
+        help="Share of the key fields (vendor, invoice number, date, total) "
+        "found in the extracted data.",
+    )
+    page_ids = fields.One2many(
+        "document.ocr.page", "document_id", string="Pages", readonly=True
+    )
     error_message = fields.Text(string="Error Message", readonly=True)
     company_id = fields.Many2one(
         "res.company",
@@ -57,6 +138,7 @@ class DocumentOCR(models.Model):
         default=lambda self: self.env.company,
     )
     ocr_language = fields.Selection([
+        ('auto', 'Auto-detect'),
         ('eng', 'English'),
         ('ara', 'Arabic'),
         ('bel', 'Belarusian'),
@@ -90,7 +172,9 @@ class DocumentOCR(models.Model):
         ('chi-sim', 'Chinese Simplified'),
         ('chi-tra', 'Chinese Traditional')
     ], string='OCR Language', required=True, default='eng',
-        help="Language used for OCR processing. If not specified, English will be used.")
+        help="Language used for OCR processing. If not specified, English will be used. "
+             "Auto-detect determines it from the PDF text layer or a low resolution OCR "
+             "of the first page.")
     ocr_provider_id = fields.Many2one(
         "ocr.provider",
         string="OCR Provider",
@@ -101,11 +185,69 @@ class DocumentOCR(models.Model):
         string="LLM Provider",
         default=lambda self: self.env["llm.provider"].get_default_provider()
     )
+    file_checksum = fields.Char(
+        string="File Checksum",
+        compute="_compute_file_hashes",
+        store=True,
+        index=True,
+        copy=False,
+    )
+    image_hash = fields.Char(
+        string="Perceptual Hash",
+        compute="_compute_file_hashes",
+        store=True,
+        index=True,
+        copy=False,
+    )
+    dedup_key = fields.Char(
+        string="Deduplication Key",
+        index=True,
+        copy=False,
+        readonly=True,
+        help="Key built from the extracted data (e.g. vendor, invoice number "
+        "and total) used to detect documents that were already processed.",
+    )
+    batch_id = fields.Many2one(
+        "document.ocr.batch",
+        string="Batch",
+        index="btree_not_null",
+        copy=False,
+        readonly=True,
+    )
+    duplicate_of_id = fields.Many2one(
+        "document.ocr",
+        string="Duplicate Of",
+        index="btree_not_null",
+        copy=False,
+        readonly=True,
+    )
+    suspected_duplicate_of_id = fields.Many2one(
+        "document.ocr",
+        string="Similar To",
+        index="btree_not_null",
+        copy=False,
+        readonly=True,
+        help="Earlier document with the same perceptual image hash. Similar "
+        "scans are still processed, they are only linked as duplicates when "
+        "their extracted data matches.",
+    )
+
+    @api.model
+    def _get_reference_model_names(self):
+        """Models that document types can link as related record"""
+        return []
 
     @api.model
     def _get_reference_models(self):
-        models = self.env["ir.model"].search([])
-        return [(model.model, model.name) for model in models]
+        return list(self._get_reference_models_cached())
+
+    @api.model
+    @tools.ormcache("self.env.lang")
+    def _get_reference_models_cached(self):
+        models = self.env["ir.model"].sudo().search(
+            [("model", "in", self._get_reference_model_names())]
+        )
+        return tuple((model.model, model.name) for model in models)
 
     def _process_data_other(self, parsed_data):
         pass
@@ -115,7 +257,162 @@ class DocumentOCR(models.Model):
         for vals in vals_list:
             if vals.get("name", "/") == "/":
                 vals["name"] = self.env["ir.sequence"].next_by_code("document.ocr")
-        return super().create(vals_list)
+        records = super().create(vals_list)
+        records._link_duplicates()
+        return records
+
+    def write(self, vals):
+        if "document_file" in vals:
+            # Results of the previous file must not be reused
+            self.page_ids.unlink()
+            vals = dict(vals, ocr_result=False)
+        res = super().write(vals)
+        if "document_file" in vals:
+            self._link_duplicates()
+        return res
+
+    @api.depends("extracted_data")
+    def _compute_parsed_data(self):
+        for record in self:
+            record.parsed_data = (
+                json.dumps(record.extracted_data, indent=2, ensure_ascii=False)
+                if record.extracted_data
+                else False
+            )
+
+    def _inverse_parsed_data(self):
+        for record in self:
+            record.extracted_data = (
+                json.loads(record.parsed_data) if record.parsed_data else False
+            )
+
+    @api.depends("extracted_data")
+    def _compute_extracted_keys(self):
+        for record in self:
+            data = record.extracted_data
+            if not isinstance(data, dict):
+                data = {}
+            record.vendor_name = data.get("vendor_name") or False
+            record.invoice_number = data.get("invoice_number") or False
+            record.invoice_date = record._safe_date(data.get("date"))
+            record.amount_total = record._safe_float(data.get("total"))
+            keys = [
+                record.vendor_name,
+                record.invoice_number,
+                record.invoice_date,
+                data.get("total") is not None,
+            ]
+            record.extraction_confidence = len([k for k in keys if k]) / len(keys)
+
+    @api.model
+    def _safe_date(self, value):
+        """Convert a date from the extracted data, False if invalid"""
+        parsed_date, _date_format = normalize_date(value, use_dateparser=False)
+        return parsed_date or False
+
+    @api.model
+    def _safe_float(self, value):
+        try:
+            return float(value or 0.0)
+        except (TypeError, ValueError):
+            return 0.0
+
+    def _store_pages(self, ocr_result):
+        """Replace the per-page OCR text and raw responses of the document"""
+        self.ensure_one()
+        self.page_ids.unlink()
+        pages = ocr_result.get("pages") or [
+            result.get("ParsedText", "") for result in ocr_result["ParsedResults"]
+        ]
+        raw_pages = ocr_result.get("raw_pages") or []
+        Page = self.env["document.ocr.page"]
+        Page.create(
+            [
+                Page._prepare_page_vals(
+                    self,
+                    index + 1,
+                    text,
+                    raw_pages[index] if index < len(raw_pages) else None,
+                )
+                for index, text in enumerate(pages)
+            ]
+        )
+
+    @api.depends("document_file", "document_filename")
+    def _compute_file_hashes(self):
+        for record in self.with_context(bin_size=False):
+            document_file = record.document_file
+            if not document_file:
+                record.file_checksum = False
+                record.image_hash = False
+                continue
+            binary_data = base64.b64decode(document_file)
+            record.file_checksum = hashlib.sha256(binary_data).hexdigest()
+            # PDFs of a vendor template render alike, only scans are hashed
+            record.image_hash = (
+                _difference_hash(binary_data) if record.file_type == "image" else False
+            )
+
+    def _get_duplicate_domain(self):
+        """Domain of the documents a duplicate of this one may point to"""
+        return [
+            ("id", "!=", self.id),
+            ("company_id", "=", self.company_id.id),
+            ("duplicate_of_id", "=", False),
+            ("state", "!=", "error"),
+        ]
+
+    def _link_duplicates(self):
+        """Link documents to an earlier upload of the same file or scan.
+
+        Only an identical file makes a duplicate whose processing is skipped.
+        Different bills printed from the same template can share a
+        perceptual hash, so a hash match is only recorded as similar.
+        """
+        for record in self:
+            links = {"duplicate_of_id": False, "suspected_duplicate_of_id": False}
+            for field_name, link in (
+                ("file_checksum", "duplicate_of_id"),
+                ("image_hash", "suspected_duplicate_of_id"),
+            ):
+                if not record[field_name]:
+                    continue
+                original = self.search(
+                    record._get_duplicate_domain()
+                    + [(field_name, "=", record[field_name])],
+                    order="id",
+                    limit=1,
+                )
+                if original:
+                    links[link] = original.id
+                    break
+            if any(record[link] != links[link] for link in links):
+                record.write(links)
+
+    def _get_duplicate_results_vals(self, original):
+        """Short-circuit processing by copying the results of the original"""
+        self.ensure_one()
+        self._post_document_message(
+            _("Duplicate of %s, its results were reused.") % original.name
+        )
+        return {
+            "duplicate_of_id": original.id,
+            "ocr_result": original.ocr_result,
+            "extracted_data": original.extracted_data,
+            "related_record": original.related_record,
+            "state": "done",
+        }
+
+    def _post_document_message(self, body):
+        """Post on the document chatter, unless it is processed in a batch.
+
+        Batches replace per-document chatter with a single summary message
+        posted on the batch.
+        """
+        if self.env.context.get("document_ocr_batch_mode"):
+            _logger.info("%s: %s", self.name, body)
+            return
+        self.message_post(body=body)
 
     @api.depends("document_file", "document_filename")
     def _compute_file_type(self):
@@ -144,77 +441,376 @@ class DocumentOCR(models.Model):
         if self.llm_provider_id:
             self.llm_provider_id = self.llm_provider_id.id
 
-    def process_document(self):
+    def _check_processable(self):
         self.ensure_one()
         if not self.document_file:
             raise UserError(_("Please upload a document file first."))
 
-        if not self.ocr_provider_id:
+        if not self.ocr_provider_id and self.duplicate_of_id.state != "done":
             raise UserError(_("Please configure an OCR provider in settings."))
 
+    def process_document(self):
+        self.ensure_one()
+        self._check_processable()
+
         try:
             self.state = "processing"
-            _logger.info("Processing document: %s", self.name)
-
-            # Create a temporary directory
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Save binary data to temporary file
-                binary_data = base64.b64decode(self.document_file)
-                temp_input = os.path.join(temp_dir, self.document_filename)
-                with open(temp_input, "wb") as f:
-                    f.write(binary_data)
-
-                # Process with OCR
-                ocr_result = self.with_context(document_id=self)._process_ocr(temp_input)
-                if not ocr_result.get("ParsedResults"):
-                    raise UserError(_("OCR processing failed. Please try again."))
-
-                # Parse OCR result
-                parsed_text = ocr_result["ParsedResults"][0]["ParsedText"]
-                parsed_json = self._parse_text_to_json(parsed_text)
-
-                # Store results
-                self.ocr_result = parsed_text
-                self.parsed_data = json.dumps(parsed_json)
-
-                # Process according to document type
-                method_name = f"_process_data_{self.document_type}"
-                if hasattr(self, method_name):
-                    getattr(self, method_name)(parsed_json)
-                else:
-                    raise UserError(
-                        _("Document type %s is not implemented") % self.document_type
-                    )
-
-                self.state = "done"
-
+            vals = self._run_pipeline()
         except Exception as e:
             error_msg = str(e)
             _logger.error("Error processing document: %s", error_msg)
             self.state = "error"
             self.error_message = error_msg
             raise UserError(_("Error processing document: %s") % error_msg)
+        self.write(vals)
 
-    def _parse_text_to_json(self, text):
-        if not self.llm_provider_id:
-            raise UserError(_("Please select an LLM provider."))
+    def _run_pipeline(self):
+        """Run OCR, extraction and document type processing.
+
+        Returns the values to write on the document, so that all the changes
+        of a run are saved with a single write. The OCR and LLM requests
+        share a deadline (document_ocr.document_deadline system parameter),
+        which is also checked between the stages.
+        """
+        self.ensure_one()
+        if not self.env.context.get("request_deadline"):
+            deadline = float(
+                self.env["ir.config_parameter"]
+                .sudo()
+                .get_param("document_ocr.document_deadline", DOCUMENT_DEADLINE)
+            )
+            return self.with_context(
+                request_deadline=time.monotonic() + deadline
+            )._run_pipeline()
+
+        if self.duplicate_of_id.state == "done":
+            _logger.info(
+                "Document %s is a duplicate of %s, skipping processing",
+                self.name,
+                self.duplicate_of_id.name,
+            )
+            return self._get_duplicate_results_vals(self.duplicate_of_id)
+
+        _logger.info("Processing document: %s", self.name)
+
+        # Reuse the OCR text already stored, e.g. by the splitting stage
+        ocr_result = self._get_stored_ocr_result() or self._run_ocr()
+        if not ocr_result.get("ParsedResults"):
+            raise UserError(_("OCR processing failed. Please try again."))
+
+        # Parse OCR result
+        parsed_text = ocr_result["ParsedResults"][0]["ParsedText"]
+        self._check_deadline()
+        parsed_json = self._parse_text_to_json(parsed_text)
+        parsed_json = self._validate_and_repair(parsed_json, parsed_text)
+        self._check_deadline()
+        if not ocr_result.get("stored"):
+            self._store_pages(ocr_result)
+
+        vals = {
+            "ocr_result": parsed_text,
+            "extracted_data": parsed_json,
+            "error_message": False,
+            "state": "done",
+            # An original that was not processed yet does not make this
+            # document a duplicate: the extracted data decides it
+            "duplicate_of_id": False,
+        }
+        vals.update(ocr_result.get("language_vals") or {})
+
+        # Process according to document type
+        method_name = f"_process_data_{self.document_type}"
+        if hasattr(self, method_name):
+            vals.update(getattr(self, method_name)(parsed_json) or {})
+        else:
+            raise UserError(
+                _("Document type %s is not implemented") % self.document_type
+            )
+        return vals
+
+    def _check_deadline(self):
+        """Stop the run once the deadline of the ``request_deadline`` context
+        key (a time.monotonic() value) has passed"""
+        deadline = self.env.context.get("request_deadline")
+        if deadline and time.monotonic() >= deadline:
+            raise UserError(_("The processing deadline was exceeded."))
+
+    def _finalize_batch(self):
+        """Create the records of documents processed in a batch.
+
+        Batch runs process documents with finalization deferred so that
+        document types can create their records for all documents at once.
+        """
+        return True
+
+    @api.model
+    def _get_unfinalized_documents(self, limit=None):
+        """Processed documents whose records were never created.
+
+        Queue workers commit documents before their finalization, so a run
+        that fails in between leaves them for the next run to finalize.
+        """
+        return self.browse()
+
+    def _run_ocr(self):
+        """Run the OCR provider on the document file"""
+        self.ensure_one()
+        # Create a temporary directory
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Save binary data to temporary file
+            binary_data = base64.b64decode(
+                self.with_context(bin_size=False).document_file
+            )
+            temp_input = os.path.join(temp_dir, self.document_filename)
+            with open(temp_input, "wb") as f:
+                f.write(binary_data)
+
+            # Process with OCR
+            return self.with_context(document_id=self)._process_ocr(temp_input)
+
+    def _get_stored_ocr_result(self):
+        """Return the stored OCR text in the OCR result format, if any"""
+        self.ensure_one()
+        if not self.ocr_result or not self.page_ids:
+            return {}
+        return {
+            "ParsedResults": [{"ParsedText": self.ocr_result}],
+            "pages": self.page_ids.mapped("text"),
+            "stored": True,
+        }
+
+    def _enqueue(self):
+        """Queue the documents for processing by the queue cron job"""
+        self.write({"state": "queued"})
+        self.env.ref("document_ocr.ir_cron_document_ocr_queue")._trigger()
+
+    def action_enqueue(self):
+        for record in self:
+            record._check_processable()
+        self._enqueue()
+
+    @api.model
+    def _cron_process_queue(self, batch_size=None):
+        """Process queued documents concurrently.
+
+        Documents are claimed and committed as processing first, then each
+        one is processed by a worker thread in its own transaction so that
+        an error only affects its own document. Documents still processing
+        after document_ocr.queue_stale_after seconds are claimed again.
+        """
+        ICP = self.env["ir.config_parameter"].sudo()
+        batch_size = batch_size or int(
+            ICP.get_param("document_ocr.queue_batch_size", QUEUE_BATCH_SIZE)
+        )
+        workers = int(ICP.get_param("document_ocr.queue_workers", QUEUE_WORKERS))
+        stale_after = int(
+            ICP.get_param("document_ocr.queue_stale_after", QUEUE_STALE_AFTER)
+        )
+        self.env.cr.execute(
+            """
+            UPDATE document_ocr
+               SET state = 'processing',
+                   write_date = (now() at time zone 'UTC')
+             WHERE id IN (
+                    SELECT id FROM document_ocr
+                     WHERE state = 'queued'
+                        OR (state = 'processing'
+                            AND write_date < (now() at time zone 'UTC') - %s * interval '1 second')
+                  ORDER BY id
+                     LIMIT %s
+                       FOR UPDATE SKIP LOCKED
+                   )
+         RETURNING id
+            """,
+            [stale_after, batch_size],
+        )
+        document_ids = [row[0] for row in self.env.cr.fetchall()]
+        if document_ids:
+            self.env.cr.commit()
+            dbname = self.env.cr.dbname
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(
+                    executor.map(
+                        lambda document_id: self._process_queued_document(
+                            dbname, document_id
+                        ),
+                        document_ids,
+                    )
+                )
+            self.env.invalidate_all()
+
+        documents = self.browse(document_ids) | self._get_unfinalized_documents(
+            limit=batch_size
+        )
+        if not documents:
+            return
+        documents = documents.with_context(
+            tracking_disable=True, document_ocr_batch_mode=True
+        )
+        documents._finalize_batch()
+        documents.parent_id._post_children_summary()
+        documents.batch_id._update_queued_state()
+        if self.search_count([("state", "=", "queued")], limit=1):
+            self.env.ref("document_ocr.ir_cron_document_ocr_queue")._trigger()
+
+    def _process_queued_document(self, dbname, document_id):
+        """Process a claimed document in a dedicated cursor (worker thread).
+
+        Never raises, so that a failure cannot abort the other workers.
+        """
+        threading.current_thread().dbname = dbname
+        try:
+            with self.env.registry.cursor() as cr:
+                env = api.Environment(
+                    cr,
+                    self.env.uid,
+                    dict(
+                        self.env.context,
+                        tracking_disable=True,
+                        mail_notrack=True,
+                        document_ocr_batch_mode=True,
+                        document_ocr_defer_finalize=True,
+                    ),
+                )
+                document = env["document.ocr"].browse(document_id)
+                try:
+                    with cr.savepoint():
+                        document._check_processable()
+                        vals = document._run_pipeline()
+                except Exception as e:
+                    _logger.error("Error processing document %s: %s", document.name, e)
+                    vals = {"state": "error", "error_message": str(e)}
+                document.write(vals)
+        except Exception as e:
+            _logger.exception("Cannot save the processing of document %s", document_id)
+            try:
+                with self.env.registry.cursor() as cr:
+                    cr.execute(
+                        """
+                        UPDATE document_ocr
+                           SET state = 'error', error_message = %s
+                         WHERE id = %s AND state = 'processing'
+                        """,
+                        [str(e), document_id],
+                    )
+            except Exception:
+                # Left processing, the document is claimed again once stale
+                _logger.exception("Cannot set document %s in error", document_id)
+
+    def action_process_batch(self):
+        """Queue the selected documents as one batch.
+
+        The documents are processed by the queue cron job rather than in the
+        request, which would not scale to a large selection.
+        """
+        documents = self.filtered(lambda d: d.state in ("draft", "error"))
+        if not documents:
+            raise UserError(_("There is no document to process in the selection."))
+        for document in documents:
+            document._check_processable()
+        batch = self.env["document.ocr.batch"].create(
+            {"document_ids": [Command.set(documents.ids)], "state": "queued"}
+        )
+        documents._enqueue()
+        return {
+            "type": "ir.actions.act_window",
+            "res_model": "document.ocr.batch",
+            "res_id": batch.id,
+            "view_mode": "form",
+        }
 
-        prompt = f"""{self._get_prompt_template()}
+    def _get_extraction_prompt(self, text):
+        return f"""{self._get_prompt_template()}
 
                 Input text to convert:
                 {text}
                 """
 
+    def _parse_text_to_json(self, text):
+        if not self.llm_provider_id:
+            raise UserError(_("Please select an LLM provider."))
+
         result = self.llm_provider_id.process_prompt(
-            prompt,
-            response_format={"type": "json_object"},
-            temperature=0.1,
+            self._get_extraction_prompt(text), **EXTRACTION_PROMPT_OPTIONS
         )
         if result.get("success"):
             return result["content"]
         else:
             raise UserError(_("Error parsing document text: %s") % result.get("error"))
 
+    def _validate_extracted_data(self, data):
+        """Check the extracted data, return a list of (field, message) issues.
+
+        Document types extend this with their own type, arithmetic and date
+        checks. Any extraction is accepted for other documents.
+        """
+        return []
+
+    def _get_reask_prompt(self, data, issues, text):
+        """Build a follow-up prompt asking only for the invalid fields"""
+        field_names = sorted({field for field, _message in issues if field})
+        issue_lines = "\n".join(
+            "- %s: %s" % (field or "document", message) for field, message in issues
+        )
+        return f"""The following JSON was extracted from the document text below,
+                but some fields are missing or inconsistent:
+                {issue_lines}
+
+                You MUST respond with ONLY a JSON object containing the corrected
+                values for these keys: {", ".join(field_names)}.
+                Keep the same format as in the extracted JSON, no explanations.
+
+                Extracted JSON:
+                {json.dumps(data, ensure_ascii=False)}
+
+                Document text:
+                {text}
+                """
+
+    def _merge_reask_result(self, data, issues, content):
+        """Merge the corrected values of the fields that were asked again"""
+        if not isinstance(content, dict):
+            return data
+        field_names = {field for field, _message in issues if field}
+        return dict(data, **{key: value for key, value in content.items() if key in field_names})
+
+    def _validate_and_repair(self, data, text):
+        """Validate the extraction and re-ask the LLM for the invalid fields.
+
+        Only the fields reported by the validation are requested again and
+        merged into the data, instead of repeating the full extraction.
+        Raises a UserError listing the issues that could not be fixed.
+        """
+        issues = self._validate_extracted_data(data)
+        for _attempt in range(MAX_REASK_ATTEMPTS):
+            if not issues or not isinstance(data, dict):
+                break
+            if not any(field for field, _message in issues):
+                break
+            self._check_deadline()
+            _logger.info(
+                "Re-asking %d invalid field(s) for document %s", len(issues), self.name
+            )
+            result = self.llm_provider_id.process_prompt(
+                self._get_reask_prompt(data, issues, text), **EXTRACTION_PROMPT_OPTIONS
+            )
+            if not result.get("success"):
+                break
+            data = self._merge_reask_result(data, issues, result["content"])
+            issues = self._validate_extracted_data(data)
+
+        if issues:
+            self._raise_extraction_issues(issues)
+        return data
+
+    def _raise_extraction_issues(self, issues):
+        raise UserError(
+            _("The extracted data is invalid:\n%s")
+            % "\n".join(
+                "%s: %s" % (field or _("document"), message) for field, message in issues
+            )
+        )
+
     def _process_ocr(self, file_path):
         """Process document with OCR provider."""
         try:
@@ -223,11 +819,17 @@ class DocumentOCR(models.Model):
 
             # Process with OCR provider
             result = self.ocr_provider_id.process_image(
-                file_data, filename=os.path.basename(file_path), language=self.ocr_language
+                file_data,
+                filename=os.path.basename(file_path),
+                language=self._get_ocr_language(),
             )
 
             if result.get("success"):
-                return {"ParsedResults": [{"ParsedText": result["text"]}]}
+                return {
+                    "ParsedResults": [{"ParsedText": result["text"]}],
+                    "pages": result.get("pages") or [result["text"]],
+                    "raw_pages": result.get("raw_pages") or [],
+                }
             else:
                 raise UserError(
                     _("OCR processing failed: %s")
@@ -0,0 +1,145 @@
+import logging
+from markupsafe import Markup
+from odoo import models, fields, api, _
+
+_logger = logging.getLogger(__name__)
+
+
+class DocumentOCRBatch(models.Model):
+    _name = "document.ocr.batch"
+    _description = "Document OCR Batch"
+    _inherit = ["mail.thread"]
+    _order = "id desc"
+
+    name = fields.Char(
+        string="Name", required=True, copy=False, readonly=True, default="/"
+    )
+    document_ids = fields.One2many(
+        "document.ocr", "batch_id", string="Documents", readonly=True
+    )
+    document_count = fields.Integer(
+        string="Documents", compute="_compute_document_stats"
+    )
+    done_count = fields.Integer(string="Done", compute="_compute_document_stats")
+    error_count = fields.Integer(string="Errors", compute="_compute_document_stats")
+    duplicate_count = fields.Integer(
+        string="Duplicates", compute="_compute_document_stats"
+    )
+    state = fields.Selection(
+        [
+            ("draft", "Draft"),
+            ("queued", "Queued"),
+            ("done", "Done"),
+        ],
+        string="Status",
+        default="draft",
+        readonly=True,
+    )
+    source = fields.Selection(
+        [
+            ("manual", "Manual"),
+            ("mail", "Email"),
+            ("folder", "Hot Folder"),
+        ],
+        string="Source",
+        default="manual",
+        required=True,
+        readonly=True,
+    )
+    intake_duration = fields.Float(
+        string="Intake Duration (s)", digits=(16, 2), readonly=True
+    )
+    intake_rate = fields.Float(
+        string="Intake Rate (documents/min)",
+        compute="_compute_intake_rate",
+        digits=(16, 1),
+    )
+    processing_duration = fields.Float(
+        string="Processing Duration (s)", digits=(16, 2), readonly=True
+    )
+    company_id = fields.Many2one(
+        "res.company",
+        string="Company",
+        required=True,
+        default=lambda self: self.env.company,
+    )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            if vals.get("name", "/") == "/":
+                vals["name"] = self.env["ir.sequence"].next_by_code(
+                    "document.ocr.batch"
+                )
+        return super().create(vals_list)
+
+    def _compute_document_stats(self):
+        stats = {
+            (batch.id, state): count
+            for batch, state, count in self.env["document.ocr"]._read_group(
+                [("batch_id", "in", self.ids)], ["batch_id", "state"], ["__count"]
+            )
+        }
+        duplicates = {
+            batch.id: count
+            for batch, count in self.env["document.ocr"]._read_group(
+                [("batch_id", "in", self.ids), ("duplicate_of_id", "!=", False)],
+                ["batch_id"],
+                ["__count"],
+            )
+        }
+        for batch in self:
+            batch.done_count = stats.get((batch.id, "done"), 0)
+            batch.error_count = stats.get((batch.id, "error"), 0)
+            batch.document_count = sum(
+                count for (batch_id, _state), count in stats.items() if batch_id == batch.id
+            )
+            batch.duplicate_count = duplicates.get(batch.id, 0)
+
+    @api.depends("intake_duration", "document_ids")
+    def _compute_intake_rate(self):
+        for batch in self:
+            batch.intake_rate = (
+                len(batch.document_ids) * 60.0 / batch.intake_duration
+                if batch.intake_duration
+                else 0.0
+            )
+
+    def _update_queued_state(self):
+        """Close queued batches once all their documents are processed"""
+        for batch in self.filtered(lambda b: b.state == "queued"):
+            documents = batch.document_ids
+            if any(d.state in ("queued", "processing") for d in documents):
+                continue
+            batch.write(
+                {
+                    "state": "done",
+                    "processing_duration": (
+                        fields.Datetime.now() - batch.create_date
+                    ).total_seconds(),
+                }
+            )
+            batch._post_summary(
+                documents,
+                {d: d.error_message for d in documents if d.state == "error"},
+            )
+
+    def _post_summary(self, documents, errors):
+        self.ensure_one()
+        lines = [
+            _(
+                "%(count)s document(s) processed in %(duration).1fs: %(done)s done, "
+                "%(errors)s in error, %(duplicates)s duplicate(s)."
+            )
+            % {
+                "count": len(documents),
+                "duration": self.processing_duration,
+                "done": len(documents.filtered(lambda d: d.state == "done")),
+                "errors": len(errors),
+                "duplicates": len(documents.filtered("duplicate_of_id")),
+            }
+        ]
+        lines += [
+            "%s: %s" % (document.name, error) for document, error in errors.items()
+        ]
+        self.message_post(body=Markup("<br/>").join(lines))
@@ -0,0 +1,146 @@
+import base64
+import logging
+import os
+import time
+from odoo import models, api, _
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = (".pdf", ".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".tif")
+# Defaults of the ingestion, overridable with system parameters
+INGEST_BATCH_SIZE = 20
+HOT_FOLDER_LIMIT = 200
+# Files modified more recently than this (seconds) may still be written
+HOT_FOLDER_MIN_AGE = 10
+
+
+class DocumentOCRIngest(models.Model):
+    _inherit = "document.ocr"
+
+    @api.model
+    def _is_supported_filename(self, filename):
+        return bool(filename) and filename.lower().endswith(SUPPORTED_EXTENSIONS)
+
+    @api.model
+    def _ingest_files(self, files, source, defaults=None):
+        """Create queued documents from an iterable of (filename, content).
+
+        Files are consumed one by one and created in batches, so only a batch
+        of files is held in memory. Processing is left to the queue cron job,
+        which keeps intake decoupled from processing throughput.
+        """
+        ICP = self.env["ir.config_parameter"].sudo()
+        batch_size = int(ICP.get_param("document_ocr.ingest_batch_size", INGEST_BATCH_SIZE))
+        defaults = dict(defaults or {})
+        document_type = ICP.get_param("document_ocr.ingest_document_type")
+        if document_type and "document_type" not in defaults:
+            defaults["document_type"] = document_type
+
+        start = time.monotonic()
+        batch = self.env["document.ocr.batch"].create(
+            {"source": source, "state": "queued"}
+        )
+        documents = self.browse()
+        vals_list = []
+        for filename, content in files:
+            vals_list.append(
+                dict(
+                    defaults,
+                    document_filename=filename,
+                    document_file=base64.b64encode(content),
+                    batch_id=batch.id,
+                    state="queued",
+                )
+            )
+            if len(vals_list) >= batch_size:
+                documents |= self.create(vals_list)
+                vals_list = []
+        if vals_list:
+            documents |= self.create(vals_list)
+
+        if not documents:
+            batch.unlink()
+            return documents
+        batch.intake_duration = time.monotonic() - start
+        _logger.info(
+            "Ingested %s documents from %s in %.2fs (%.1f documents/minute)",
+            len(documents),
+            source,
+            batch.intake_duration,
+            batch.intake_rate,
+        )
+        self.env.ref("document_ocr.ir_cron_document_ocr_queue")._trigger()
+        return documents
+
+    @api.model
+    def _get_mail_files(self, msg_dict):
+        """Return the (filename, content) of the supported email attachments"""
+        return [
+            (
+                attachment[0],
+                attachment[1].encode() if isinstance(attachment[1], str) else attachment[1],
+            )
+            for attachment in msg_dict.get("attachments") or []
+            if self._is_supported_filename(attachment[0])
+        ]
+
+    @api.model
+    def message_new(self, msg_dict, custom_values=None):
+        """Create a queued document for each supported attachment of an email.
+
+        The email is then posted on the first document by the mail gateway.
+        Emails without attachment to process are bounced before reaching
+        this method, see mail.thread _routing_check_route.
+        """
+        files = self._get_mail_files(msg_dict)
+        if not files:
+            raise UserError(
+                _("Email %s has no PDF or image attachment to process.")
+                % msg_dict.get("message_id")
+            )
+        documents = self._ingest_files(files, "mail", defaults=custom_values)
+        return documents[0]
+
+    @api.model
+    def _cron_ingest_hot_folder(self):
+        """Ingest the files dropped in the hot folder.
+
+        Ingested files are moved to a "processed" subfolder once the
+        documents are committed.
+        """
+        ICP = self.env["ir.config_parameter"].sudo()
+        path = ICP.get_param("document_ocr.hot_folder")
+        if not path or not os.path.isdir(path):
+            return
+        limit = int(ICP.get_param("document_ocr.hot_folder_limit", HOT_FOLDER_LIMIT))
+        processed_path = os.path.join(path, "processed")
+        os.makedirs(processed_path, exist_ok=True)
+
+        now = time.time()
+        entries = sorted(
+            (
+                entry
+                for entry in os.scandir(path)
+                if entry.is_file()
+                and self._is_supported_filename(entry.name)
+                and now - entry.stat().st_mtime >= HOT_FOLDER_MIN_AGE
+            ),
+            key=lambda entry: entry.stat().st_mtime,
+        )[:limit]
+        if not entries:
+            return
+
+        def read_files():
+            for entry in entries:
+                with open(entry.path, "rb") as f:
+                    yield entry.name, f.read()
+
+        self._ingest_files(read_files(), "folder")
+        self.env.cr.commit()
+
+        prefix = time.strftime("%Y%m%d%H%M%S")
+        for entry in entries:
+            os.replace(
+                entry.path, os.path.join(processed_path, "%s_%s" % (prefix, entry.name))
+            )
@@ -0,0 +1,159 @@
+import base64
+import io
+import logging
+import time
+from odoo import models, fields, _
+from odoo.tools.image import image_process
+from odoo.tools.pdf import PdfFileReader
+from odoo.addons.base_ocr.models.ocr_provider import AUTO_LANGUAGE
+from odoo.addons.document_ocr.tools.language_detector import detect_language
+
+_logger = logging.getLogger(__name__)
+
+# Text layers with fewer characters are treated as scans without text
+TEXT_LAYER_MIN_CHARS = 50
+TEXT_LAYER_MAX_PAGES = 2
+# Size of the top of the preview sent to the OCR to detect the language
+SAMPLE_SIZE = (1024, 512)
+DEFAULT_LANGUAGE = "eng"
+
+
+class DocumentOCRLanguage(models.Model):
+    _inherit = "document.ocr"
+
+    detected_language = fields.Selection(
+        selection="_get_detectable_languages",
+        string="Detected Language",
+        readonly=True,
+        copy=False,
+    )
+    language_detection_source = fields.Selection(
+        [("text_layer", "PDF Text Layer"), ("ocr_sample", "OCR Sample")],
+        string="Detected From",
+        readonly=True,
+        copy=False,
+    )
+    language_detection_confidence = fields.Float(
+        string="Detection Confidence", readonly=True, copy=False
+    )
+    language_detection_time = fields.Float(
+        string="Detection Time (s)", readonly=True, copy=False
+    )
+    language_detection_confirmed = fields.Boolean(
+        string="Detection Confirmed",
+        readonly=True,
+        copy=False,
+        help="The language detected on the full OCR text matches the "
+        "language detected before the OCR.",
+    )
+
+    def _get_detectable_languages(self):
+        return [
+            language
+            for language in self._fields["ocr_language"].selection
+            if language[0] != "auto"
+        ]
+
+    def _get_ocr_language(self):
+        """Language to run the OCR with, resolving auto-detection"""
+        self.ensure_one()
+        if self.ocr_language != "auto":
+            return self.ocr_language
+        return (
+            self.env.context.get("document_ocr_language")
+            or self.detected_language
+            or DEFAULT_LANGUAGE
+        )
+
+    def _get_pdf_text_layer(self):
+        """Return the text layer of the first pages of a PDF, if any"""
+        self.ensure_one()
+        if self.file_type != "pdf":
+            return ""
+        try:
+            reader = PdfFileReader(
+                io.BytesIO(base64.b64decode(self.with_context(bin_size=False).document_file)),
+                strict=False,
+            )
+            texts = []
+            for index in range(min(reader.getNumPages(), TEXT_LAYER_MAX_PAGES)):
+                page = reader.getPage(index)
+                extract = getattr(page, "extract_text", None) or page.extractText
+                texts.append(extract() or "")
+            return "\n".join(texts)
+        except Exception as e:
+            _logger.debug("Cannot read the text layer of %s: %s", self.name, e)
+            return ""
+
+    def _get_ocr_sample_text(self):
+        """OCR the top of the low resolution preview of the first page.
+
+        The sample is read with the provider's own language detection, an
+        OCR in a fixed language garbling other scripts. Providers without it
+        return no sample, leaving the language of scans undetected.
+        """
+        self.ensure_one()
+        preview = self.with_context(bin_size=False).preview_image
+        provider = self.ocr_provider_id
+        if not preview or not provider or not provider._supports_auto_language():
+            return ""
+        try:
+            sample = image_process(
+                base64.b64decode(preview), size=SAMPLE_SIZE, crop="top", output_format="JPEG"
+            )
+        except Exception as e:
+            _logger.debug("Cannot crop the preview of %s: %s", self.name, e)
+            return ""
+        result = provider.with_context(document_id=self).process_image(
+            # A crop rarely has a date or total, which would make the
+            # adaptive mode escalate the sample to a second request
+            sample, filename="sample.jpg", language=AUTO_LANGUAGE, ocr_mode="fixed"
+        )
+        return result.get("text", "") if result.get("success") else ""
+
+    def _detect_language(self):
+        """Detect the document language before running the full OCR.
+
+        The text layer of PDFs is used when there is one, otherwise the top
+        of the preview is OCR'd. Returns the values to write on the document.
+        """
+        self.ensure_one()
+        start = time.monotonic()
+        source, code, confidence = False, False, 0.0
+        text = self._get_pdf_text_layer()
+        if len(text.strip()) >= TEXT_LAYER_MIN_CHARS:
+            source = "text_layer"
+        else:
+            text = self._get_ocr_sample_text()
+            source = "ocr_sample" if text else False
+        if text:
+            code, confidence = detect_language(text)
+        vals = {
+            "detected_language": code or False,
+            "language_detection_source": source if code else False,
+            "language_detection_confidence": confidence,
+            "language_detection_time": time.monotonic() - start,
+            "language_detection_confirmed": False,
+        }
+        _logger.info(
+            "Detected language %s (%.2f) for %s from %s in %.2fs",
+            code, confidence, self.name, source, vals["language_detection_time"],
+        )
+        return vals
+
+    def _run_ocr(self):
+        if self.ocr_language != "auto":
+            return super()._run_ocr()
+        language_vals = self._detect_language()
+        language = language_vals["detected_language"] or DEFAULT_LANGUAGE
+        ocr_result = super(
+            DocumentOCRLanguage, self.with_context(document_ocr_language=language)
+        )._run_ocr()
+        # The full text tells whether the detection picked the right language
+        if language_vals["detected_language"]:
+            full_text = ocr_result["ParsedResults"][0]["ParsedText"]
+            language_vals["language_detection_confirmed"] = (
+                detect_language(full_text)[0] == language_vals["detected_language"]
+            )
+        ocr_result["language_vals"] = language_vals
+        return ocr_result
@@ -0,0 +1,73 @@
+import base64
+import json
+import zlib
+from odoo import models, fields, api
+
+
+class DocumentOCRPage(models.Model):
+    _name = "document.ocr.page"
+    _description = "Document OCR Page"
+    _order = "document_id, page_number"
+
+    document_id = fields.Many2one(
+        "document.ocr",
+        string="Document",
+        required=True,
+        index=True,
+        ondelete="cascade",
+    )
+    page_number = fields.Integer(string="Page", required=True, default=1)
+    text_compressed = fields.Binary(
+        string="Compressed Text", attachment=False, prefetch=False
+    )
+    raw_response_compressed = fields.Binary(
+        string="Compressed Raw Response", attachment=False, prefetch=False
+    )
+    text = fields.Text(string="Text", compute="_compute_text")
+    raw_response = fields.Text(string="Raw Response", compute="_compute_raw_response")
+
+    _sql_constraints = [
+        (
+            "document_page_unique",
+            "unique(document_id, page_number)",
+            "A page can only be stored once per document.",
+        ),
+    ]
+
+    @api.model
+    def _compress(self, value):
+        """Compress a string into the base64 value stored in binary fields"""
+        if not value:
+            return False
+        return base64.b64encode(zlib.compress(value.encode("utf-8"), 6))
+
+    @api.model
+    def _decompress(self, value):
+        if not value:
+            return False
+        return zlib.decompress(base64.b64decode(value)).decode("utf-8")
+
+    @api.model
+    def _prepare_page_vals(self, document, page_number, text, raw_response=None):
+        return {
+            "document_id": document.id,
+            "page_number": page_number,
+            "text_compressed": self._compress(text),
+            "raw_response_compressed": self._compress(
+                json.dumps(raw_response) if raw_response else False
+            ),
+        }
+
+    @api.depends("text_compressed")
+    def _compute_text(self):
+        for page in self:
+            page.text = self._decompress(
+                page.with_context(bin_size=False).text_compressed
+            )
+
+    @api.depends("raw_response_compressed")
+    def _compute_raw_response(self):
+        for page in self:
+            page.raw_response = self._decompress(
+                page.with_context(bin_size=False).raw_response_compressed
+            )
@@ -0,0 +1,106 @@
+import base64
+import logging
+import os
+import subprocess
+import tempfile
+from odoo import models, fields, api
+from odoo.tools import find_in_path
+from odoo.tools.image import image_process
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import fitz
+except ImportError:
+    fitz = None
+
+PREVIEW_SIZE = (1024, 1024)
+THUMBNAIL_SIZE = (256, 256)
+PREVIEW_QUALITY = 80
+
+
+class DocumentOCRPreview(models.Model):
+    _inherit = "document.ocr"
+
+    preview_image = fields.Binary(
+        string="Preview",
+        compute="_compute_preview_images",
+        store=True,
+        attachment=True,
+        copy=False,
+    )
+    thumbnail_image = fields.Binary(
+        string="Thumbnail",
+        compute="_compute_preview_images",
+        store=True,
+        attachment=True,
+        copy=False,
+    )
+
+    @api.model
+    def _render_pdf_first_page(self, pdf_data):
+        """Render the first page of a PDF as PNG, False if no renderer is available"""
+        if fitz:
+            try:
+                with fitz.open(stream=pdf_data, filetype="pdf") as pdf:
+                    zoom = PREVIEW_SIZE[0] / max(pdf[0].rect.width, pdf[0].rect.height)
+                    return pdf[0].get_pixmap(matrix=fitz.Matrix(zoom, zoom)).tobytes("png")
+            except Exception as e:
+                _logger.warning("Cannot render PDF preview with PyMuPDF: %s", e)
+                return False
+        try:
+            pdftoppm = find_in_path("pdftoppm")
+        except IOError:
+            return False
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pdf_path = os.path.join(temp_dir, "document.pdf")
+            with open(pdf_path, "wb") as f:
+                f.write(pdf_data)
+            output_prefix = os.path.join(temp_dir, "preview")
+            try:
+                subprocess.run(
+                    [
+                        pdftoppm, "-png", "-f", "1", "-l", "1", "-singlefile",
+                        "-scale-to", str(PREVIEW_SIZE[0]), pdf_path, output_prefix,
+                    ],
+                    check=True,
+                    capture_output=True,
+                    timeout=30,
+                )
+                with open(output_prefix + ".png", "rb") as f:
+                    return f.read()
+            except (OSError, subprocess.SubprocessError) as e:
+                _logger.warning("Cannot render PDF preview with pdftoppm: %s", e)
+                return False
+
+    @api.depends("document_file", "document_filename")
+    def _compute_preview_images(self):
+        for record in self:
+            record.preview_image = record.thumbnail_image = False
+            document_file = record.with_context(bin_size=False).document_file
+            if not document_file or not record.file_type:
+                continue
+            source = base64.b64decode(document_file)
+            if record.file_type == "pdf":
+                source = self._render_pdf_first_page(source)
+                if not source:
+                    continue
+            try:
+                record.preview_image = base64.b64encode(
+                    image_process(
+                        source,
+                        size=PREVIEW_SIZE,
+                        output_format="JPEG",
+                        quality=PREVIEW_QUALITY,
+                    )
+                )
+                record.thumbnail_image = base64.b64encode(
+                    image_process(
+                        source,
+                        size=THUMBNAIL_SIZE,
+                        output_format="JPEG",
+                        quality=PREVIEW_QUALITY,
+                    )
+                )
+            except Exception as e:
+                _logger.warning("Cannot generate preview of %s: %s", record.name, e)
@@ -0,0 +1,193 @@
+import cProfile
+import io
+import logging
+import marshal
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+# Number of functions listed in the text report
+PROFILE_REPORT_LIMIT = 60
+# Only one cProfile profiler can be active at a time in a process
+_profiler_lock = threading.Lock()
+# Memory tracing is process wide: it is shared by the profiled runs and only
+# stopped by the last one, if it was not already tracing before the first
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_state = {"runs": 0, "started": False}
+
+
+def _start_tracemalloc():
+    with _tracemalloc_lock:
+        if not _tracemalloc_state["runs"]:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                _tracemalloc_state["started"] = True
+        _tracemalloc_state["runs"] += 1
+
+
+def _stop_tracemalloc():
+    """Return the traced memory peak in MB"""
+    with _tracemalloc_lock:
+        peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        _tracemalloc_state["runs"] -= 1
+        if not _tracemalloc_state["runs"] and _tracemalloc_state["started"]:
+            tracemalloc.stop()
+            _tracemalloc_state["started"] = False
+        return peak
+
+
+class DocumentOCRProfile(models.Model):
+    _inherit = "document.ocr"
+
+    profiling_enabled = fields.Boolean(
+        string="Profile Processing",
+        copy=False,
+        help="Profile the next processing runs of this document. Documents "
+        "are also profiled at random according to the "
+        "document_ocr.profile_sample_rate system parameter (percentage).",
+    )
+    profile_date = fields.Datetime(string="Profiled On", readonly=True, copy=False)
+    profile_duration = fields.Float(string="Duration (s)", readonly=True, copy=False)
+    profile_query_count = fields.Integer(string="SQL Queries", readonly=True, copy=False)
+    profile_query_time = fields.Float(string="SQL Time (s)", readonly=True, copy=False)
+    profile_memory_peak = fields.Float(
+        string="Memory Peak (MB)",
+        readonly=True,
+        copy=False,
+        help="Peak of the memory allocated by Python while processing. "
+        "Allocations of documents processed at the same time are included.",
+    )
+    profile_attachment_ids = fields.One2many(
+        "ir.attachment",
+        "res_id",
+        string="Profiles",
+        domain=[("res_model", "=", "document.ocr"), ("name", "=like", "profile-%")],
+        readonly=True,
+    )
+
+    def _should_profile(self):
+        self.ensure_one()
+        if self.profiling_enabled:
+            return True
+        rate = float(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("document_ocr.profile_sample_rate", 0)
+        )
+        return rate > 0 and random.random() * 100 < rate
+
+    def _run_pipeline(self):
+        # The pipeline calls itself again to set its deadline: decide once
+        if "document_ocr_profiling" in self.env.context:
+            return super()._run_pipeline()
+        if not self._should_profile():
+            return super(
+                DocumentOCRProfile, self.with_context(document_ocr_profiling=False)
+            )._run_pipeline()
+        return self.with_context(document_ocr_profiling=True)._run_pipeline_profiled()
+
+    def _run_pipeline_profiled(self):
+        """Run the pipeline collecting SQL, CPU and memory statistics.
+
+        The statistics are written on the document with the other results,
+        the reports are saved as attachments in their own transaction so
+        that they are kept when the processing fails.
+        """
+        self.ensure_one()
+        thread = threading.current_thread()
+        query_count = getattr(thread, "query_count", None)
+        query_time = getattr(thread, "query_time", None)
+        # The cursor only counts queries when the thread has the counters
+        thread.query_count, thread.query_time = 0, 0.0
+        _start_tracemalloc()
+        profiler = cProfile.Profile() if _profiler_lock.acquire(blocking=False) else None
+        start = time.monotonic()
+        error = None
+        try:
+            if profiler:
+                profiler.enable()
+            vals = super()._run_pipeline()
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            if profiler:
+                profiler.disable()
+                _profiler_lock.release()
+            stats = {
+                "profile_date": fields.Datetime.now(),
+                "profile_duration": time.monotonic() - start,
+                "profile_query_count": thread.query_count,
+                "profile_query_time": thread.query_time,
+                "profile_memory_peak": _stop_tracemalloc(),
+            }
+            if query_count is None:
+                del thread.query_count, thread.query_time
+            else:
+                thread.query_count = query_count + stats["profile_query_count"]
+                thread.query_time = query_time + stats["profile_query_time"]
+            self._save_profile(stats, profiler, error)
+        vals.update(stats)
+        return vals
+
+    def _save_profile(self, stats, profiler, error=None):
+        """Store the profile report and raw cProfile data as attachments"""
+        self.ensure_one()
+        _logger.info(
+            "Profiled %s: %.2fs, %s queries in %.2fs, %.1f MB peak",
+            self.name,
+            stats["profile_duration"],
+            stats["profile_query_count"],
+            stats["profile_query_time"],
+            stats["profile_memory_peak"],
+        )
+        report = io.StringIO()
+        report.write(
+            "Document: %s\nDate: %s\nResult: %s\nDuration: %.3fs\n"
+            "SQL queries: %s (%.3fs)\nMemory peak: %.2f MB\n\n"
+            % (
+                self.name,
+                stats["profile_date"],
+                "error: %s" % error if error else "success",
+                stats["profile_duration"],
+                stats["profile_query_count"],
+                stats["profile_query_time"],
+                stats["profile_memory_peak"],
+            )
+        )
+        attachments = []
+        prefix = "profile-%s-%s" % (
+            self.name.replace("/", "_"),
+            stats["profile_date"].strftime("%Y%m%d%H%M%S"),
+        )
+        if profiler:
+            profile_stats = pstats.Stats(profiler, stream=report)
+            profile_stats.sort_stats("cumulative").print_stats(PROFILE_REPORT_LIMIT)
+            attachments.append(
+                (prefix + ".prof", marshal.dumps(profile_stats.stats), "application/octet-stream")
+            )
+        else:
+            report.write("No CPU profile: another document was being profiled.\n")
+        attachments.append((prefix + ".txt", report.getvalue().encode(), "text/plain"))
+
+        with self.env.registry.cursor() as cr:
+            env = api.Environment(cr, self.env.uid, self.env.context)
+            env["ir.attachment"].create(
+                [
+                    {
+                        "name": name,
+                        "raw": raw,
+                        "mimetype": mimetype,
+                        "res_model": self._name,
+                        "res_id": self.id,
+                    }
+                    for name, raw, mimetype in attachments
+                ]
+            )
@@ -0,0 +1,281 @@
+import difflib
+import hashlib
+import json
+import logging
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.addons.document_ocr.models.document_ocr import (
+    EXTRACTION_PROMPT_OPTIONS,
+    MAX_REASK_ATTEMPTS,
+    QUEUE_BATCH_SIZE,
+    QUEUE_WORKERS,
+)
+
+_logger = logging.getLogger(__name__)
+
+
+class DocumentOCRReextract(models.Model):
+    _inherit = "document.ocr"
+
+    prompt_version = fields.Char(
+        string="Prompt Version",
+        index=True,
+        copy=False,
+        readonly=True,
+        help="Version of the prompt template that produced the extracted data.",
+    )
+    prompt_outdated = fields.Boolean(
+        string="Outdated Prompt",
+        compute="_compute_prompt_outdated",
+        search="_search_prompt_outdated",
+    )
+    reextract_requested = fields.Boolean(
+        string="Re-extraction Requested", index=True, copy=False, readonly=True
+    )
+    extraction_diff = fields.Text(
+        string="Changes of the Last Re-extraction",
+        copy=False,
+        readonly=True,
+        prefetch=False,
+    )
+
+    def _get_prompt_version(self):
+        """Version of the prompt template of the document type.
+
+        Derived from the template text, whitespace aside, so that any change
+        of the template gives a new version.
+        """
+        self.ensure_one()
+        template = " ".join(self._get_prompt_template().split())
+        return "%s-%s" % (
+            self.document_type,
+            hashlib.sha1(template.encode()).hexdigest()[:10],
+        )
+
+    @api.model
+    def _get_current_prompt_versions(self):
+        """Current prompt version of each document type"""
+        return {
+            document_type: self.new({"document_type": document_type})._get_prompt_version()
+            for document_type, _label in self._fields["document_type"].selection
+        }
+
+    @api.depends("prompt_version", "document_type", "state")
+    def _compute_prompt_outdated(self):
+        """Processed documents are outdated when extracted with another
+        version, or before versions were recorded"""
+        versions = self._get_current_prompt_versions()
+        for record in self:
+            record.prompt_outdated = (
+                record.state == "done"
+                and record.prompt_version != versions.get(record.document_type)
+            )
+
+    def _search_prompt_outdated(self, operator, value):
+        if operator not in ("=", "!=") or not isinstance(value, bool):
+            raise UserError(_("Operation not supported"))
+        versions = self._get_current_prompt_versions()
+        outdated = ["|"] * (len(versions) - 1)
+        for document_type, version in versions.items():
+            # != also matches the documents without version
+            outdated += [
+                "&",
+                ("document_type", "=", document_type),
+                ("prompt_version", "!=", version),
+            ]
+        outdated = ["&", ("state", "=", "done")] + outdated
+        if (operator == "=") == value:
+            return outdated
+        return ["!"] + outdated
+
+    def _run_pipeline(self):
+        vals = super()._run_pipeline()
+        if "extracted_data" in vals and "prompt_version" not in vals:
+            vals["prompt_version"] = self._get_prompt_version()
+        return vals
+
+    def _get_duplicate_results_vals(self, original):
+        vals = super()._get_duplicate_results_vals(original)
+        vals["prompt_version"] = original.prompt_version
+        return vals
+
+    def action_reextract(self):
+        """Queue the extraction of processed documents with the current prompt.
+
+        Only the LLM stage runs again, on the stored OCR text, and the
+        records created from the documents (e.g. vendor bills) are kept,
+        along with the fields they were deduplicated on.
+        """
+        documents = self.filtered(lambda d: d.state == "done" and d.ocr_result)
+        if not documents:
+            raise UserError(_("Only processed documents with OCR text can be re-extracted."))
+        documents.write({"reextract_requested": True})
+        self.env.ref("document_ocr.ir_cron_document_ocr_reextract")._trigger()
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": _("Re-extraction"),
+                "message": _("%s documents queued for re-extraction.") % len(documents),
+                "type": "success",
+            },
+        }
+
+    @api.model
+    def _cron_reextract(self, batch_size=None):
+        """Re-extract a batch of requested documents, then reschedule"""
+        ICP = self.env["ir.config_parameter"].sudo()
+        batch_size = batch_size or int(
+            ICP.get_param("document_ocr.queue_batch_size", QUEUE_BATCH_SIZE)
+        )
+        documents = self.search([("reextract_requested", "=", True)], limit=batch_size)
+        documents.with_context(tracking_disable=True, mail_notrack=True)._reextract()
+        if self.search_count([("reextract_requested", "=", True)], limit=1):
+            self.env.ref("document_ocr.ir_cron_document_ocr_reextract")._trigger()
+
+    def _reextract(self):
+        """Run the extraction prompt again over the stored OCR text.
+
+        The prompts of each LLM provider, and then the follow-up prompts
+        for invalid fields, are sent concurrently, at most
+        document_ocr.queue_workers at a time. The previous output is kept
+        on errors, and its differences with the new output are stored when
+        document_ocr.reextract_diff is enabled.
+        """
+        ICP = self.env["ir.config_parameter"].sudo()
+        workers = int(ICP.get_param("document_ocr.queue_workers", QUEUE_WORKERS))
+        with_diff = ICP.get_param("document_ocr.reextract_diff", "True") != "False"
+        for provider in self.llm_provider_id:
+            documents = self.filtered(lambda d: d.llm_provider_id == provider)
+            results = provider.process_prompts(
+                [document._get_extraction_prompt(document.ocr_result) for document in documents],
+                max_workers=workers,
+                **EXTRACTION_PROMPT_OPTIONS,
+            )
+            data_by_document, errors = {}, {}
+            for document, result in zip(documents, results):
+                if result.get("success"):
+                    data_by_document[document] = result["content"]
+                else:
+                    errors[document] = _("Error parsing document text: %s") % result.get(
+                        "error"
+                    )
+            data_by_document = self._repair_extractions(provider, data_by_document, workers)
+            for document in documents:
+                document._write_reextraction(
+                    data_by_document.get(document), errors.get(document), with_diff
+                )
+        self.filtered(lambda d: not d.llm_provider_id).write(
+            {
+                "reextract_requested": False,
+                "error_message": _("Re-extraction failed: no LLM provider."),
+            }
+        )
+
+    @api.model
+    def _repair_extractions(self, provider, data_by_document, workers):
+        """Re-ask the invalid fields of several extractions concurrently.
+
+        Bulk counterpart of _validate_and_repair, returns the merged data.
+        """
+        data_by_document = dict(data_by_document)
+        for _attempt in range(MAX_REASK_ATTEMPTS):
+            to_repair = {}
+            for document, data in data_by_document.items():
+                issues = document._validate_extracted_data(data)
+                if isinstance(data, dict) and any(field for field, _message in issues):
+                    to_repair[document] = issues
+            if not to_repair:
+                break
+            _logger.info("Re-asking invalid fields of %s documents", len(to_repair))
+            results = provider.process_prompts(
+                [
+                    document._get_reask_prompt(
+                        data_by_document[document], issues, document.ocr_result
+                    )
+                    for document, issues in to_repair.items()
+                ],
+                max_workers=workers,
+                **EXTRACTION_PROMPT_OPTIONS,
+            )
+            for (document, issues), result in zip(to_repair.items(), results):
+                if result.get("success"):
+                    data_by_document[document] = document._merge_reask_result(
+                        data_by_document[document], issues, result["content"]
+                    )
+        return data_by_document
+
+    def _get_frozen_extraction_fields(self):
+        """Fields that re-extraction must not change, e.g. the fields the
+        record created from the document was deduplicated on"""
+        return ()
+
+    def _freeze_extraction_fields(self, data):
+        """Keep the previous values of the frozen fields in the new data.
+
+        New values are reported on the document, so that the created record
+        can be checked, instead of leaving it out of sync with the data.
+        """
+        self.ensure_one()
+        previous = self.extracted_data
+        if not isinstance(data, dict) or not isinstance(previous, dict):
+            return data
+        frozen = [field for field in self._get_frozen_extraction_fields() if field in previous]
+        changes = [
+            "%s: %s → %s" % (field, previous[field], data.get(field))
+            for field in frozen
+            if data.get(field) != previous[field]
+        ]
+        if changes:
+            self._post_document_message(
+                _(
+                    "Re-extraction found other values for fields of %s, "
+                    "which were kept unchanged: %s"
+                )
+                % (self.related_record.display_name, ", ".join(changes))
+            )
+        return dict(data, **{field: previous[field] for field in frozen})
+
+    def _write_reextraction(self, data, error=None, with_diff=True):
+        self.ensure_one()
+        try:
+            with self.env.cr.savepoint():
+                if error:
+                    raise UserError(error)
+                data = self._freeze_extraction_fields(data)
+                issues = self._validate_extracted_data(data)
+                if issues:
+                    self._raise_extraction_issues(issues)
+                vals = {
+                    "extracted_data": data,
+                    "prompt_version": self._get_prompt_version(),
+                    "reextract_requested": False,
+                    "error_message": False,
+                }
+                if with_diff:
+                    vals["extraction_diff"] = self._get_extraction_diff(
+                        self.extracted_data, data
+                    )
+                self.write(vals)
+        except Exception as e:
+            _logger.error("Error re-extracting document %s: %s", self.name, e)
+            self.write(
+                {
+                    "reextract_requested": False,
+                    "error_message": _("Re-extraction failed: %s") % e,
+                }
+            )
+
+    @api.model
+    def _get_extraction_diff(self, old, new):
+        """Unified diff of two extraction outputs, False when they are equal"""
+        old_lines = json.dumps(old or {}, indent=2, sort_keys=True, ensure_ascii=False)
+        new_lines = json.dumps(new or {}, indent=2, sort_keys=True, ensure_ascii=False)
+        diff = difflib.unified_diff(
+            old_lines.splitlines(),
+            new_lines.splitlines(),
+            "previous",
+            "current",
+            lineterm="",
+        )
+        return "\n".join(diff) or False
@@ -0,0 +1,216 @@
+import base64
+import io
+import logging
+import os
+import re
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.tools.pdf import PdfFileReader, PdfFileWriter
+
+_logger = logging.getLogger(__name__)
+
+# Pages with fewer characters are considered blank separator sheets
+BLANK_PAGE_CHARS = 10
+FIRST_PAGE_RE = re.compile(
+    r"\b(page|seite|p[aá]gina|pagina)\s*1\s*(of|/|von|de|sur|di)\s*\d+\b", re.IGNORECASE
+)
+INVOICE_NUMBER_RE = re.compile(
+    r"\b(?:invoice|facture|rechnung|factura|fattura|bill)\s*"
+    r"(?:no\.?|n[°º]|nr\.?|num(?:ber|éro|ero)?\.?|#)?\s*[:#]?\s*"
+    # Invoice numbers have a digit, so that "Invoice Date" is not one
+    r"((?=[A-Z/_-]*\d)[A-Z0-9][A-Z0-9/_-]{2,})",
+    re.IGNORECASE,
+)
+INVOICE_TITLE_RE = re.compile(
+    r"\b(invoice|facture|rechnung|factura|fattura)\b", re.IGNORECASE
+)
+
+
+def _page_header(text):
+    """First non-empty line of a page, normalized for comparison"""
+    for line in text.splitlines():
+        line = " ".join(line.split()).lower()
+        if line:
+            return line
+    return ""
+
+
+def detect_document_boundaries(pages):
+    """Split a list of page texts into documents.
+
+    Returns a list of (first, last) zero-based page index ranges. A new
+    document starts after a blank separator page, on a "Page 1 of N" marker,
+    when the invoice number changes, or when an invoice page has a different
+    header (usually the vendor name) than the current document.
+    """
+    ranges = []
+    start = None
+    invoice_number = header = None
+    for index, text in enumerate(pages):
+        text = text or ""
+        if len(text.strip()) < BLANK_PAGE_CHARS:
+            if start is not None:
+                ranges.append((start, index - 1))
+                start = None
+            continue
+
+        match = INVOICE_NUMBER_RE.search(text)
+        page_invoice_number = match.group(1).upper() if match else None
+        page_header = _page_header(text)
+        new_document = start is None or bool(FIRST_PAGE_RE.search(text))
+        if not new_document and page_invoice_number and invoice_number:
+            new_document = page_invoice_number != invoice_number
+        if not new_document and not page_invoice_number:
+            new_document = bool(
+                INVOICE_TITLE_RE.search(text[:500]) and page_header != header
+            )
+
+        if new_document:
+            if start is not None:
+                ranges.append((start, index - 1))
+            start = index
+            invoice_number = page_invoice_number
+            header = page_header
+        elif page_invoice_number and not invoice_number:
+            invoice_number = page_invoice_number
+
+    if start is not None:
+        ranges.append((start, len(pages) - 1))
+    return ranges
+
+
+class DocumentOCRSplit(models.Model):
+    _inherit = "document.ocr"
+
+    parent_id = fields.Many2one(
+        "document.ocr",
+        string="Source Document",
+        index="btree_not_null",
+        ondelete="set null",
+        copy=False,
+        readonly=True,
+    )
+    child_ids = fields.One2many(
+        "document.ocr", "parent_id", string="Split Documents", readonly=True
+    )
+    child_count = fields.Integer(
+        string="Split Documents", compute="_compute_child_count"
+    )
+    page_from = fields.Integer(string="From Page", readonly=True, copy=False)
+    page_to = fields.Integer(string="To Page", readonly=True, copy=False)
+
+    @api.depends("child_ids")
+    def _compute_child_count(self):
+        counts = {
+            parent.id: count
+            for parent, count in self._read_group(
+                [("parent_id", "in", self.ids)], ["parent_id"], ["__count"]
+            )
+        }
+        for record in self:
+            record.child_count = counts.get(record.id, 0)
+
+    def action_split_document(self):
+        """Split a multi-document PDF scan into separate documents.
+
+        The scan is OCR'd once, document boundaries are detected from the
+        page texts and each document is created as a child record with its
+        pages and OCR text, then queued to be processed concurrently.
+        """
+        self.ensure_one()
+        self._check_processable()
+        if self.file_type != "pdf":
+            raise UserError(_("Only PDF documents can be split."))
+
+        ocr_result = self._get_stored_ocr_result() or self._run_ocr()
+        pages = ocr_result.get("pages") or []
+        if not ocr_result.get("stored"):
+            self._store_pages(ocr_result)
+        ranges = detect_document_boundaries(pages)
+        if len(ranges) < 2:
+            raise UserError(_("No separate documents were found in this file."))
+
+        reader = PdfFileReader(
+            io.BytesIO(base64.b64decode(self.with_context(bin_size=False).document_file)),
+            strict=False,
+        )
+        if reader.getNumPages() != len(pages):
+            raise UserError(
+                _("The OCR returned %s pages for a %s pages file.")
+                % (len(pages), reader.getNumPages())
+            )
+
+        basename = os.path.splitext(self.document_filename or self.name)[0]
+        language_vals = ocr_result.get("language_vals") or {}
+        raw_pages = ocr_result.get("raw_pages") or []
+        vals_list = []
+        for number, (first, last) in enumerate(ranges, start=1):
+            writer = PdfFileWriter()
+            for index in range(first, last + 1):
+                writer.addPage(reader.getPage(index))
+            stream = io.BytesIO()
+            writer.write(stream)
+            vals_list.append(
+                {
+                    "document_file": base64.b64encode(stream.getvalue()),
+                    "document_filename": "%s_%s.pdf" % (basename, number),
+                    "document_type": self.document_type,
+                    "ocr_language": self.ocr_language,
+                    "ocr_provider_id": self.ocr_provider_id.id,
+                    "llm_provider_id": self.llm_provider_id.id,
+                    "company_id": self.company_id.id,
+                    "parent_id": self.id,
+                    "page_from": first + 1,
+                    "page_to": last + 1,
+                    "ocr_result": "\n".join(pages[first:last + 1]),
+                    **language_vals,
+                }
+            )
+
+        children = self.create(vals_list)
+        Page = self.env["document.ocr.page"]
+        page_vals = []
+        for child, (first, last) in zip(children, ranges):
+            page_vals += [
+                Page._prepare_page_vals(
+                    child,
+                    index - first + 1,
+                    pages[index],
+                    raw_pages[index] if index < len(raw_pages) else None,
+                )
+                for index in range(first, last + 1)
+            ]
+        Page.create(page_vals)
+        children._enqueue()
+
+        self.write({"state": "done", "ocr_result": "\n".join(pages), **language_vals})
+        self.message_post(
+            body=_("Split into %s documents, queued for processing.") % len(children)
+        )
+        return self.action_view_children()
+
+    def action_view_children(self):
+        self.ensure_one()
+        return {
+            "type": "ir.actions.act_window",
+            "name": _("Split Documents"),
+            "res_model": "document.ocr",
+            "view_mode": "list,form",
+            "domain": [("parent_id", "=", self.id)],
+        }
+
+    def _post_children_summary(self):
+        """Post a summary on source documents once all their parts are processed"""
+        for parent in self:
+            children = parent.child_ids
+            if any(child.state in ("queued", "processing") for child in children):
+                continue
+            errors = children.filtered(lambda c: c.state == "error")
+            parent.message_post(
+                body=_("%(done)s of %(count)s split documents processed, %(errors)s in error.")
+                % {
+                    "done": len(children) - len(errors),
+                    "count": len(children),
+                    "errors": len(errors),
+                }
+            )
@@ -0,0 +1,38 @@
+import logging
+from odoo import models, api, _
+
+_logger = logging.getLogger(__name__)
+
+
+class MailThread(models.AbstractModel):
+    _inherit = "mail.thread"
+
+    @api.model
+    def _routing_check_route(self, message, message_dict, route, raise_exception=True):
+        """Bounce emails to the document alias without a file to process.
+
+        Like the alias contact check, the sender is told why the email was
+        rejected and the email creates nothing.
+        """
+        route = super()._routing_check_route(
+            message, message_dict, route, raise_exception=raise_exception
+        )
+        if (
+            route
+            and route[0] == "document.ocr"
+            and not route[1]
+            and not self.env["document.ocr"]._get_mail_files(message_dict)
+        ):
+            _logger.info(
+                "Bouncing email %s from %s: no PDF or image attachment",
+                message_dict.get("message_id"),
+                message_dict.get("email_from"),
+            )
+            self._routing_create_bounce_email(
+                message_dict.get("email_from"),
+                _("Your email was not processed: it has no PDF or image attachment."),
+                message,
+                references=message_dict.get("message_id"),
+            )
+            return False
+        return route
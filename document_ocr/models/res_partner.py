@@ -0,0 +1,11 @@
+from odoo import models, fields
+
+
+class ResPartner(models.Model):
+    _inherit = "res.partner"
+
+    ocr_date_format = fields.Char(
+        string="OCR Date Format",
+        help="Date format last recognized on this vendor's documents, "
+        "tried first when reading their dates.",
+    )
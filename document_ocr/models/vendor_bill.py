@@ -1,4 +1,21 @@
-from odoo import models, fields, api
+import logging
+from collections import defaultdict
+from dateutil.relativedelta import relativedelta
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.osv import expression
+from odoo.tools import float_repr
+from odoo.tools.sql import escape_psql
+from odoo.addons.document_ocr.tools.date_normalizer import (
+    DATEPARSER_FORMAT,
+    normalize_date,
+)
+
+_logger = logging.getLogger(__name__)
+
+# Absolute and relative tolerance used to reconcile amounts
+AMOUNT_TOLERANCE = 0.01
+AMOUNT_RELATIVE_TOLERANCE = 0.005
 
 
 class VendorBill(models.Model):
@@ -11,6 +28,10 @@ class VendorBill(models.Model):
         required=True,
     )
 
+    @api.model
+    def _get_reference_model_names(self):
+        return super()._get_reference_model_names() + ["account.move"]
+
     def _get_prompt_template(self):
         """Get the prompt template based on document type"""
         result = super()._get_prompt_template()
@@ -37,62 +58,246 @@ class VendorBill(models.Model):
                     """
         return result
 
-    def _parse_date(self, date_str):
-        """Parse date string to YYYY-MM-DD format using dateparser."""
-        if not date_str:
+    @api.model
+    def _amounts_match(self, expected, actual):
+        tolerance = max(AMOUNT_TOLERANCE, abs(expected) * AMOUNT_RELATIVE_TOLERANCE)
+        return abs(expected - actual) <= tolerance
+
+    @api.model
+    def _to_number(self, value):
+        """Return the value as a float, None if it is not a number.
+
+        Numeric strings such as "12.50" are accepted.
+        """
+        if isinstance(value, bool):
+            return None
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, str):
+            try:
+                return float(value.strip())
+            except ValueError:
+                return None
+        return None
+
+    def _validate_extracted_data(self, data):
+        issues = super()._validate_extracted_data(data)
+        if self.document_type != "vendor_bill" or issues:
+            return issues
+        if not isinstance(data, dict):
+            return [("", _("The extraction is not a JSON object."))]
+
+        for field in ("vendor_name", "invoice_number"):
+            if not isinstance(data.get(field), str) or not data[field].strip():
+                issues.append((field, _("missing")))
+
+        invoice_date = fields.Date.to_date(self._parse_date(data.get("date")))
+        today = fields.Date.context_today(self)
+        if not invoice_date:
+            issues.append(("date", _("missing or not a valid date")))
+        elif invoice_date > today + relativedelta(days=1):
+            issues.append(("date", _("%s is in the future") % invoice_date))
+        elif invoice_date < today - relativedelta(years=10):
+            issues.append(("date", _("%s is more than 10 years ago") % invoice_date))
+
+        for field in ("total_tax", "total_discount"):
+            if data.get(field) is not None and self._to_number(data[field]) is None:
+                issues.append((field, _("must be a number")))
+        total = self._to_number(data.get("total"))
+        if total is None:
+            issues.append(("total", _("missing or not a number")))
+
+        line_items = data.get("line_items")
+        if not isinstance(line_items, list) or not line_items:
+            issues.append(("line_items", _("missing")))
+            return issues
+
+        lines_total = 0.0
+        for index, item in enumerate(line_items, start=1):
+            if not isinstance(item, dict):
+                issues.append(("line_items", _("line %s is not an object") % index))
+                continue
+            quantity = self._to_number(item.get("quantity", 1.0))
+            price = self._to_number(item.get("price"))
+            subtotal = self._to_number(item.get("subtotal"))
+            if quantity is None or price is None:
+                issues.append(
+                    ("line_items", _("line %s: quantity and price must be numbers") % index)
+                )
+                continue
+            if subtotal is None:
+                subtotal = quantity * price
+            elif not self._amounts_match(subtotal, quantity * price):
+                issues.append(
+                    (
+                        "line_items",
+                        _("line %s: quantity * price (%s) does not match subtotal (%s)")
+                        % (index, quantity * price, subtotal),
+                    )
+                )
+            lines_total += subtotal
+
+        if total is not None:
+            expected_total = (
+                lines_total
+                + (self._to_number(data.get("total_tax")) or 0.0)
+                - abs(self._to_number(data.get("total_discount")) or 0.0)
+            )
+            if not self._amounts_match(total, expected_total):
+                issues.append(
+                    (
+                        "total",
+                        _("lines + tax - discount (%s) does not match total (%s)")
+                        % (round(expected_total, 2), total),
+                    )
+                )
+        return issues
+
+    def _parse_date(self, date_str, partner=None):
+        """Parse date string to YYYY-MM-DD format, False if it cannot be parsed.
+
+        The format that matched is remembered on the vendor and tried first
+        for its next documents.
+        """
+        parsed_date, date_format = normalize_date(
+            date_str, preferred_format=partner.ocr_date_format if partner else None
+        )
+        if not parsed_date:
             return False
+        if (
+            partner
+            and date_format != DATEPARSER_FORMAT
+            and partner.ocr_date_format != date_format
+        ):
+            partner.ocr_date_format = date_format
+        return fields.Date.to_string(parsed_date)
 
+    def _get_vendor_bill_dedup_key(self, partner, parsed_data):
+        """Build the (partner, invoice number, total) deduplication key"""
+        if not partner:
+            return False
+        invoice_number = (parsed_data.get("invoice_number") or "").strip().upper()
+        if not invoice_number:
+            return False
         try:
-            import dateparser
-
-            parsed_date = dateparser.parse(
-                date_str,
-                settings={
-                    "PREFER_DAY_OF_MONTH": "first",
-                    "PREFER_DATES_FROM": "past",
-                    "RETURN_AS_TIMEZONE_AWARE": False,
-                    "DATE_ORDER": "DMY",
-                },
-            )
-            if parsed_date:
-                return fields.Date.to_string(parsed_date.date())
-        except Exception as e:
-            _logger.warning("Date parsing failed for %s: %s", date_str, str(e))
+            total = float(parsed_data.get("total") or 0.0)
+        except (TypeError, ValueError):
+            total = 0.0
+        return "%s|%s|%s" % (partner.id, invoice_number, float_repr(total, 2))
 
-        return fields.Date.today()
+    def _get_frozen_extraction_fields(self):
+        frozen = super()._get_frozen_extraction_fields()
+        if self.document_type == "vendor_bill" and self.related_record:
+            # The dedup_key and the bill were built from them
+            frozen += ("vendor_name", "invoice_number", "total")
+        return frozen
 
     def _process_data_vendor_bill(self, parsed_data):
-        """Create vendor bill from parsed data"""
-        # Find or create vendor
-        partner = self.env["res.partner"].search(
-            [("name", "ilike", parsed_data.get("vendor_name"))], limit=1
+        """Create vendor bill from parsed data, return the document values.
+
+        When finalization is deferred (batch processing), bills are created
+        later for all the documents at once by _finalize_batch.
+        """
+        if self.env.context.get("document_ocr_defer_finalize"):
+            return {}
+        vals = self._create_vendor_bills({self: parsed_data})[self]
+        if vals.get("state") == "error":
+            raise UserError(vals["error_message"])
+        return vals
+
+    def _finalize_batch(self):
+        """Create the vendor bills of processed documents in one go"""
+        res = super()._finalize_batch()
+        documents = self.filtered(
+            lambda d: d.document_type == "vendor_bill"
+            and d.state == "done"
+            and not d.related_record
+            and not d.duplicate_of_id
+            and isinstance(d.extracted_data, dict)
+        )
+        if not documents:
+            return res
+        results = documents._create_vendor_bills(
+            {document: document.extracted_data for document in documents}
         )
+        documents._write_finalization_results(results)
+        return res
 
-        if not partner:
-            partner = self.env["res.partner"].create(
-                {
-                    "name": parsed_data.get("vendor_name"),
-                    "company_type": "company",
-                    "is_company": True,
-                }
+    @api.model
+    def _get_unfinalized_documents(self, limit=None):
+        return super()._get_unfinalized_documents(limit=limit) | self.search(
+            [
+                ("document_type", "=", "vendor_bill"),
+                ("state", "=", "done"),
+                ("related_record", "=", False),
+                ("duplicate_of_id", "=", False),
+                # Split scans are done once their parts are created
+                ("child_ids", "=", False),
+                ("extracted_data", "!=", False),
+            ],
+            limit=limit,
+        )
+
+    @api.model
+    def _find_or_create_by_name(self, model_name, names, get_create_vals):
+        """Find or create the records of the given names, by lowercase name.
+
+        Records are matched on their name ignoring case, then on part of
+        their name, among the records shared or of the current company.
+        Missing records are created with the values of get_create_vals(name).
+        """
+        Model = self.env[model_name]
+        company_domain = Model._check_company_domain(self.env.company)
+        names = {name.strip() for name in names if name and name.strip()}
+        records = {}
+        if names:
+            domain = expression.OR(
+                [[("name", "=ilike", escape_psql(name))] for name in names]
             )
+            for record in Model.search(
+                expression.AND([domain, company_domain]), order="id desc"
+            ):
+                records[record.name.lower()] = record
+        for name in names:
+            if name.lower() not in records:
+                record = Model.search(
+                    expression.AND([[("name", "ilike", escape_psql(name))], company_domain]),
+                    limit=1,
+                )
+                if record:
+                    records[name.lower()] = record
+        missing = sorted({name for name in names if name.lower() not in records})
+        if missing:
+            for record in Model.create([get_create_vals(name) for name in missing]):
+                records[record.name.lower()] = record
+        return records
+
+    @api.model
+    def _get_vendor_bill_partners(self, names):
+        """Find or create the vendors of the given names, by lowercase name"""
+        return self._find_or_create_by_name(
+            "res.partner",
+            names,
+            lambda name: {"name": name, "company_type": "company", "is_company": True},
+        )
 
+    @api.model
+    def _get_vendor_bill_products(self, names):
+        """Find or create the service products of the given names"""
+        return self._find_or_create_by_name(
+            "product.product",
+            names,
+            lambda name: {"name": name, "type": "service", "purchase_ok": True},
+        )
+
+    def _prepare_vendor_bill_vals(self, parsed_data, partner, products):
+        """Values of the vendor bill of a document"""
         lines = []
         # Add regular product lines with no tax
         for item in parsed_data.get("line_items", []):
-            product = self.env["product.product"].search(
-                [("name", "ilike", item.get("product"))], limit=1
-            )
-
+            product = products.get((item.get("product") or "").strip().lower())
             if not product:
-                product = self.env["product.product"].create(
-                    {
-                        "name": item.get("product"),
-                        "type": "service",
-                        "purchase_ok": True,
-                    }
-                )
-
+                raise UserError(_("A line item has no product."))
             lines.append(
                 (
                     0,
@@ -100,8 +305,8 @@ class VendorBill(models.Model):
                     {
                         "product_id": product.id,
                         "name": item.get("description") or product.name,
-                        "quantity": item.get("quantity", 1.0),
-                        "price_unit": item.get("price", 0.0),
+                        "quantity": self._to_number(item.get("quantity", 1.0)) or 0.0,
+                        "price_unit": self._to_number(item.get("price")) or 0.0,
                         "tax_ids": [(5, 0, 0)],  # Clear all taxes
                     },
                 )
@@ -109,25 +314,15 @@ class VendorBill(models.Model):
 
         # Add tax line if present
         if parsed_data.get("total_tax"):
-            tax_product = self.env["product.product"].search(
-                [("name", "=", "Tax")], limit=1
-            ) or self.env["product.product"].create(
-                {
-                    "name": "Tax",
-                    "type": "service",
-                    "purchase_ok": True,
-                }
-            )
-
             lines.append(
                 (
                     0,
                     0,
                     {
-                        "product_id": tax_product.id,
+                        "product_id": products["tax"].id,
                         "name": "Tax",
                         "quantity": 1.0,
-                        "price_unit": parsed_data.get("total_tax", 0.0),
+                        "price_unit": self._to_number(parsed_data.get("total_tax")) or 0.0,
                         "tax_ids": [(5, 0, 0)],  # No tax on tax line
                     },
                 )
@@ -135,42 +330,186 @@ class VendorBill(models.Model):
 
         # Add discount line if present
         if parsed_data.get("total_discount"):
-            discount_product = self.env["product.product"].search(
-                [("name", "=", "Discount")], limit=1
-            ) or self.env["product.product"].create(
-                {
-                    "name": "Discount",
-                    "type": "service",
-                    "purchase_ok": True,
-                }
-            )
-
             lines.append(
                 (
                     0,
                     0,
                     {
-                        "product_id": discount_product.id,
+                        "product_id": products["discount"].id,
                         "name": "Discount",
                         "quantity": 1.0,
                         "price_unit": -abs(
-                            parsed_data.get("total_discount", 0.0)
+                            self._to_number(parsed_data.get("total_discount")) or 0.0
                         ),  # Always make discount negative
                         "tax_ids": [(5, 0, 0)],  # No tax on discount line
                     },
                 )
             )
 
-        # Create the vendor bill with parsed date
-        bill = self.env["account.move"].create(
-            {
-                "move_type": "in_invoice",
-                "partner_id": partner.id,
-                "invoice_date": self._parse_date(parsed_data.get("date")),
-                "ref": parsed_data.get("invoice_number"),
-                "invoice_line_ids": lines,
-            }
+        return {
+            "move_type": "in_invoice",
+            "partner_id": partner.id,
+            "invoice_date": self._parse_date(parsed_data.get("date"), partner),
+            "ref": parsed_data.get("invoice_number"),
+            "invoice_line_ids": lines,
+        }
+
+    def _create_vendor_bills(self, data_by_document):
+        """Create the vendor bills of several documents with a single create.
+
+        Vendors and products are looked up for all documents at once and
+        bills already processed, in the database or earlier in the batch, are
+        linked instead of created. If the grouped create fails, bills are
+        created one by one so that a bad bill only fails its own document.
+
+        Bills are created in the company of their document, with the
+        vendors and products available to that company.
+
+        Returns the values to write on each document.
+        """
+        companies = {document.company_id for document in data_by_document}
+        if len(companies) > 1:
+            results = {}
+            for company in companies:
+                results.update(
+                    self.with_company(company)._create_vendor_bills(
+                        {
+                            document: data
+                            for document, data in data_by_document.items()
+                            if document.company_id == company
+                        }
+                    )
+                )
+            return results
+        if companies:
+            self = self.with_company(companies.pop())
+
+        partners = self._get_vendor_bill_partners(
+            [data.get("vendor_name") for data in data_by_document.values()]
         )
+        product_names = set()
+        for data in data_by_document.values():
+            product_names.update(
+                item.get("product") for item in data.get("line_items", [])
+            )
+            if data.get("total_tax"):
+                product_names.add("Tax")
+            if data.get("total_discount"):
+                product_names.add("Discount")
+        products = self._get_vendor_bill_products(product_names)
+
+        # Skip bill creation when the same bill was already processed
+        keys = {
+            document: document._get_vendor_bill_dedup_key(
+                partners.get((data.get("vendor_name") or "").strip().lower(), False),
+                data,
+            )
+            for document, data in data_by_document.items()
+        }
+        originals = {}
+        if any(keys.values()):
+            for original in self.search(
+                [
+                    ("dedup_key", "in", [key for key in keys.values() if key]),
+                    ("state", "=", "done"),
+                    ("duplicate_of_id", "=", False),
+                    ("id", "not in", [document.id for document in data_by_document]),
+                ],
+                order="id desc",
+            ):
+                originals[(original.company_id, original.dedup_key)] = original
+
+        results = {}
+        to_create = {}
+        for document, data in data_by_document.items():
+            key = keys[document]
+            original = originals.get((document.company_id, key))
+            if original in data_by_document:
+                # Linked once the bill of the original is created below
+                continue
+            if original:
+                _logger.info(
+                    "Vendor bill %s already processed as %s", key, original.name
+                )
+                document._post_document_message(
+                    _("Duplicate of %s, no new vendor bill was created.")
+                    % original.name
+                )
+                results[document] = {
+                    "duplicate_of_id": original.id,
+                    "related_record": original.related_record,
+                }
+                continue
+            try:
+                partner = partners.get((data.get("vendor_name") or "").strip().lower())
+                if not partner:
+                    raise UserError(_("The vendor name is missing."))
+                to_create[document] = document.with_env(
+                    self.env
+                )._prepare_vendor_bill_vals(data, partner, products)
+            except Exception as e:
+                results[document] = {"state": "error", "error_message": str(e)}
+                continue
+            if key:
+                originals[(document.company_id, key)] = document
+
+        bills = self._create_account_moves(to_create)
+        for document, bill in bills.items():
+            if isinstance(bill, Exception):
+                results[document] = {"state": "error", "error_message": str(bill)}
+            else:
+                results[document] = {"dedup_key": keys[document], "related_record": bill}
+
+        # Documents duplicating a bill created in this batch
+        for document, data in data_by_document.items():
+            if document in results:
+                continue
+            original = originals[(document.company_id, keys[document])]
+            if results[original].get("state") == "error":
+                results[document] = results[original]
+                continue
+            document._post_document_message(
+                _("Duplicate of %s, no new vendor bill was created.") % original.name
+            )
+            results[document] = {
+                "duplicate_of_id": original.id,
+                "related_record": results[original]["related_record"],
+            }
+        return results
+
+    @api.model
+    def _create_account_moves(self, vals_by_document):
+        """Create the bills, return {document: bill or exception}"""
+        if not vals_by_document:
+            return {}
+        AccountMove = self.env["account.move"]
+        try:
+            with self.env.cr.savepoint():
+                bills = AccountMove.create(list(vals_by_document.values()))
+            return dict(zip(vals_by_document, bills))
+        except Exception as e:
+            if len(vals_by_document) == 1:
+                return {next(iter(vals_by_document)): e}
+            _logger.warning(
+                "Grouped creation of %s vendor bills failed (%s), "
+                "creating them one by one",
+                len(vals_by_document),
+                e,
+            )
+        results = {}
+        for document, vals in vals_by_document.items():
+            try:
+                with self.env.cr.savepoint():
+                    results[document] = AccountMove.create(vals)
+            except Exception as e:
+                _logger.error("Vendor bill creation failed for %s: %s", document.name, e)
+                results[document] = e
+        return results
 
-        # Set the related record
-        self.related_record = bill
+    def _write_finalization_results(self, results):
+        """Save the finalization results, with one write per distinct values"""
+        documents_by_vals = defaultdict(list)
+        for document, vals in results.items():
+            documents_by_vals[tuple(sorted(vals.items()))].append(document.id)
+        for vals, document_ids in documents_by_vals.items():
+            self.browse(document_ids).write(dict(vals))
@@ -0,0 +1,111 @@
+import base64
+import os
+import tempfile
+import time
+from email.message import EmailMessage
+from unittest.mock import patch
+
+from odoo.tests import TransactionCase, tagged
+
+# 1x1 PNG image
+PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+)
+
+
+@tagged("post_install", "-at_install")
+class TestDocumentOCRIngest(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.alias_domain = cls.env["mail.alias.domain"].create({"name": "ocr.example.com"})
+        cls.alias = cls.env.ref("document_ocr.mail_alias_document_ocr")
+        cls.alias.alias_domain_id = cls.alias_domain
+        cls.vendor = cls.env["res.partner"].create(
+            {"name": "Vendor", "email": "vendor@example.com"}
+        )
+
+    def _build_email(self, attachments, email_from="vendor@example.com"):
+        message = EmailMessage()
+        message["From"] = email_from
+        message["To"] = "ocr-documents@ocr.example.com"
+        message["Subject"] = "Invoices"
+        message["Message-Id"] = "<%s@example.com>" % time.monotonic_ns()
+        message.set_content("Please find our invoices attached.")
+        for filename, content, maintype, subtype in attachments:
+            message.add_attachment(
+                content, maintype=maintype, subtype=subtype, filename=filename
+            )
+        return message.as_string()
+
+    def test_message_process(self):
+        raw = self._build_email(
+            [
+                ("invoice.png", PNG, "image", "png"),
+                ("notes.txt", b"not a document", "text", "plain"),
+            ]
+        )
+        thread_id = self.env["mail.thread"].message_process(False, raw)
+
+        document = self.env["document.ocr"].browse(thread_id)
+        self.assertEqual(document.document_filename, "invoice.png")
+        self.assertEqual(document.state, "queued")
+        self.assertEqual(document.batch_id.source, "mail")
+        self.assertEqual(len(document.batch_id.document_ids), 1)
+        self.assertIn("Invoices", document.message_ids.mapped("subject"))
+
+    def test_message_process_without_attachment(self):
+        raw = self._build_email([("notes.txt", b"not a document", "text", "plain")])
+        documents = self.env["document.ocr"].search([])
+        with patch.object(
+            self.registry["mail.thread"], "_routing_create_bounce_email"
+        ) as bounce:
+            self.env["mail.thread"].message_process(False, raw)
+
+        bounce.assert_called_once()
+        self.assertEqual(self.env["document.ocr"].search([]), documents)
+
+    def test_message_process_unknown_sender(self):
+        raw = self._build_email(
+            [("invoice.png", PNG, "image", "png")], email_from="someone@example.org"
+        )
+        documents = self.env["document.ocr"].search([])
+        self.env["mail.thread"].message_process(False, raw)
+        self.assertEqual(self.env["document.ocr"].search([]), documents)
+
+    def test_cron_ingest_hot_folder(self):
+        with tempfile.TemporaryDirectory() as folder:
+            written = time.time() - 60
+            for filename in ("scan.png", "notes.txt"):
+                path = os.path.join(folder, filename)
+                with open(path, "wb") as f:
+                    f.write(PNG)
+                os.utime(path, (written, written))
+            # Recently modified files may still be written
+            with open(os.path.join(folder, "partial.png"), "wb") as f:
+                f.write(PNG)
+            self.env["ir.config_parameter"].sudo().set_param(
+                "document_ocr.hot_folder", folder
+            )
+
+            with patch.object(self.env.cr, "commit"):
+                self.env["document.ocr"]._cron_ingest_hot_folder()
+
+            document = self.env["document.ocr"].search(
+                [("document_filename", "=", "scan.png")]
+            )
+            self.assertEqual(len(document), 1)
+            self.assertEqual(document.state, "queued")
+            self.assertEqual(document.batch_id.source, "folder")
+            self.assertEqual(base64.b64decode(document.document_file), PNG)
+            self.assertFalse(
+                self.env["document.ocr"].search(
+                    [("document_filename", "in", ["notes.txt", "partial.png"])]
+                )
+            )
+            self.assertEqual(
+                sorted(os.listdir(folder)), ["notes.txt", "partial.png", "processed"]
+            )
+            processed = os.listdir(os.path.join(folder, "processed"))
+            self.assertEqual(len(processed), 1)
+            self.assertTrue(processed[0].endswith("_scan.png"))
@@ -0,0 +1,2 @@
+from . import date_normalizer
+from . import language_detector
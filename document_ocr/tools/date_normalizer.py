@@ -0,0 +1,152 @@
+"""Date normalization for extracted documents.
+
+Tries a small list of precompiled formats before falling back to dateparser,
+which is slow to import and to run. The format that matched is returned so
+callers can remember it (e.g. per vendor) and try it first next time.
+"""
+import logging
+import re
+from datetime import date
+
+_logger = logging.getLogger(__name__)
+
+# Tried in order, day-first formats before month-first ones
+DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%d/%m/%Y",
+    "%d.%m.%Y",
+    "%d-%m-%Y",
+    "%Y/%m/%d",
+    "%Y.%m.%d",
+    "%m/%d/%Y",
+    "%d/%m/%y",
+    "%d.%m.%y",
+    "%d-%m-%y",
+    "%d %B %Y",
+    "%d %b %Y",
+    "%B %d %Y",
+    "%b %d %Y",
+    "%Y%m%d",
+)
+DATEPARSER_FORMAT = "dateparser"
+DATEPARSER_SETTINGS = {
+    "PREFER_DAY_OF_MONTH": "first",
+    "PREFER_DATES_FROM": "past",
+    "RETURN_AS_TIMEZONE_AWARE": False,
+    "DATE_ORDER": "DMY",
+}
+MIN_YEAR = 1900
+MAX_YEAR = 2100
+
+_CLEANUP_RE = re.compile(r"(?<=\d)(st|nd|rd|th)\b|,", re.IGNORECASE)
+_SPACES_RE = re.compile(r"\s+")
+# ISO 8601 datetimes, e.g. "2024-03-12T00:00:00Z": the date part is kept
+_ISO_DATETIME_RE = re.compile(
+    r"(\d{4}-\d{2}-\d{2})[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?",
+    re.IGNORECASE,
+)
+_DIRECTIVES = {
+    "%Y": r"(?P<Y>\d{4})",
+    "%y": r"(?P<y>\d{2})",
+    "%m": r"(?P<m>\d{1,2})",
+    "%d": r"(?P<d>\d{1,2})",
+    "%B": r"(?P<B>[A-Za-z]+)",
+    "%b": r"(?P<b>[A-Za-z]+)\.?",
+}
+_MONTHS = {
+    name: index
+    for index, month in enumerate(
+        (
+            "january", "february", "march", "april", "may", "june",
+            "july", "august", "september", "october", "november", "december",
+        ),
+        start=1,
+    )
+    for name in (month, month[:3])
+}
+_MONTHS["sept"] = 9
+_dateparser = None
+
+
+def _compile_format(date_format):
+    """Compile a strptime-like format into an anchored regex"""
+    if date_format == "%Y%m%d":
+        return re.compile(r"(?P<Y>\d{4})(?P<m>\d{2})(?P<d>\d{2})")
+    pattern = ""
+    index = 0
+    while index < len(date_format):
+        directive = date_format[index:index + 2]
+        if directive in _DIRECTIVES:
+            pattern += _DIRECTIVES[directive]
+            index += 2
+        else:
+            pattern += re.escape(date_format[index])
+            index += 1
+    return re.compile(pattern, re.IGNORECASE)
+
+
+_COMPILED_FORMATS = {date_format: _compile_format(date_format) for date_format in DATE_FORMATS}
+
+
+def _get_dateparser():
+    global _dateparser
+    if _dateparser is None:
+        import dateparser
+
+        _dateparser = dateparser
+    return _dateparser
+
+
+def _match(value, date_format):
+    regex = _COMPILED_FORMATS.get(date_format)
+    match = regex and regex.fullmatch(value)
+    if not match:
+        return None
+    groups = match.groupdict()
+    if "Y" in groups:
+        year = int(groups["Y"])
+    else:
+        year = 2000 + int(groups["y"])
+    month_name = groups.get("B") or groups.get("b")
+    month = _MONTHS.get(month_name.lower()) if month_name else int(groups["m"])
+    if not month or not MIN_YEAR <= year <= MAX_YEAR:
+        return None
+    try:
+        return date(year, month, int(groups["d"]))
+    except ValueError:
+        return None
+
+
+def normalize_date(value, preferred_format=None, use_dateparser=True):
+    """Parse a date string.
+
+    Returns a (date, format) tuple, where format is the format of
+    DATE_FORMATS that matched or DATEPARSER_FORMAT, and (None, None) when the
+    value cannot be parsed.
+    """
+    if not value or not isinstance(value, str):
+        return None, None
+    value = value.strip()
+    iso_datetime = _ISO_DATETIME_RE.fullmatch(value)
+    if iso_datetime:
+        value = iso_datetime.group(1)
+    value = _SPACES_RE.sub(" ", _CLEANUP_RE.sub("", value)).strip()
+
+    if preferred_format and preferred_format != DATEPARSER_FORMAT:
+        parsed = _match(value, preferred_format)
+        if parsed:
+            return parsed, preferred_format
+    for date_format in DATE_FORMATS:
+        parsed = _match(value, date_format)
+        if parsed:
+            return parsed, date_format
+
+    if use_dateparser:
+        try:
+            parsed = _get_dateparser().parse(value, settings=DATEPARSER_SETTINGS)
+        except Exception as e:
+            _logger.warning("Date parsing failed for %s: %s", value, e)
+            parsed = None
+        if parsed and MIN_YEAR <= parsed.year <= MAX_YEAR:
+            return parsed.date(), DATEPARSER_FORMAT
+    return None, None
@@ -0,0 +1,111 @@
+"""Lightweight language detection of OCR and PDF text.
+
+Non-Latin scripts are recognized from their Unicode ranges; Latin script
+languages are scored on frequent words, including common invoice
+vocabulary. Codes are the ones of the document.ocr ocr_language field.
+"""
+import re
+from collections import Counter
+
+MIN_WORDS = 5
+
+SCRIPT_RANGES = (
+    (0x0600, 0x06FF, "ara"),
+    (0x0590, 0x05FF, "heb"),
+    (0x0400, 0x04FF, "cyrillic"),
+    (0x0370, 0x03FF, "ell"),
+    (0x0E00, 0x0E7F, "tha"),
+    (0x0900, 0x097F, "hin"),
+    (0x0980, 0x09FF, "ben"),
+    (0xAC00, 0xD7AF, "kor"),
+    (0x1100, 0x11FF, "kor"),
+    (0x3040, 0x30FF, "jpn"),
+    (0x4E00, 0x9FFF, "cjk"),
+)
+# Characters used in Traditional but not in Simplified Chinese
+TRADITIONAL_CHARS = set("們這個來時會說與發對開關貨號單價額總計稅")
+# Letters of a Cyrillic language, and letters it does not use: Russian also
+# has ъ and Belarusian і, only their absence tells the languages apart
+CYRILLIC_MARKERS = (
+    ("bel", set("ў"), set()),
+    ("ukr", set("іїєґ"), set("ыэё")),
+    ("bul", set("ъ"), set("ыэё")),
+)
+STOPWORDS = {
+    "eng": "the and of to for with from invoice total date amount due tax bill number",
+    "fra": "le la les des et du pour une avec facture total date montant tva numéro",
+    "deu": "der die das und mit für von rechnung datum betrag gesamt mwst nummer",
+    "spa": "el la los las del y para con factura fecha importe total iva número",
+    "ita": "il la di che per con del della fattura data importo totale iva numero",
+    "por": "o a os as do da e para com fatura data valor total número",
+    "nld": "de het een en van voor met factuur datum bedrag totaal btw nummer",
+    "dan": "og i af til for med faktura dato beløb moms nummer ialt",
+    "swe": "och att av för med till faktura datum belopp moms summa nummer",
+    "nor": "og av til for med faktura dato beløp mva sum nummer",
+    "fin": "ja on että lasku päivämäärä summa yhteensä alv numero",
+    "pol": "i w na z do dla faktura data kwota razem suma vat numer",
+    "ces": "a v na s do pro faktura datum částka celkem dph číslo",
+    "ron": "și în de la cu pentru factura data suma total tva număr",
+    "tur": "ve bir bu için ile fatura tarih tutar toplam kdv numara",
+    "ind": "dan yang untuk dengan dari faktur tanggal jumlah total pajak nomor",
+    "isl": "og að á til fyrir með reikningur dagsetning upphæð samtals vsk",
+    "vie": "và của cho với hóa đơn ngày tổng tiền thuế số",
+}
+STOPWORDS = {code: set(words.split()) for code, words in STOPWORDS.items()}
+WORD_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+
+def _script_of(char):
+    code_point = ord(char)
+    for start, end, script in SCRIPT_RANGES:
+        if start <= code_point <= end:
+            return script
+    return None
+
+
+def detect_language(text):
+    """Detect the language of a text.
+
+    Returns a (code, confidence) tuple, confidence being between 0 and 1,
+    or (None, 0.0) when the text is too short to decide.
+    """
+    if not text:
+        return None, 0.0
+    letters = [char for char in text if char.isalpha()]
+    if not letters:
+        return None, 0.0
+
+    scripts = Counter(_script_of(char) for char in letters)
+    script, count = scripts.most_common(1)[0]
+    if script:
+        confidence = count / len(letters)
+        if script == "cjk" and scripts["jpn"]:
+            # Kanji are shared with Chinese, kana are Japanese only
+            script = "jpn"
+        elif script == "cjk":
+            script = "chi-tra" if TRADITIONAL_CHARS & set(text) else "chi-sim"
+        elif script == "cyrillic":
+            lowered = set(text.lower())
+            script = next(
+                (
+                    code
+                    for code, markers, missing in CYRILLIC_MARKERS
+                    if markers & lowered and not missing & lowered
+                ),
+                "rus",
+            )
+        return script, confidence
+
+    words = [word.lower() for word in WORD_RE.findall(text)]
+    if len(words) < MIN_WORDS:
+        return None, 0.0
+    scores = Counter()
+    for word in words:
+        for code, stopwords in STOPWORDS.items():
+            if word in stopwords:
+                scores[code] += 1
+    if not scores:
+        return None, 0.0
+    (code, best), *others = scores.most_common(2)
+    runner_up = others[0][1] if others else 0
+    return code, (best - runner_up) / best